@@ -0,0 +1 @@
+"""Benchmarks of motor-decorator hot paths, run by `python -m benchmarks`"""
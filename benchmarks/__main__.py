@@ -0,0 +1,43 @@
+"""
+Run benchmarks of controller hot paths against in-process stand-in of motor collection layer:
+
+    python -m benchmarks                                  # print report
+    python -m benchmarks --save benchmarks/baseline.json  # store new baseline
+    python -m benchmarks --compare benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import logging
+import sys
+
+from .cases import build_cases
+from .runner import run, save, load, compare, format_report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="motor-decorator benchmarks")
+    parser.add_argument("-k", "--filter", help="run only cases which name contains the substring")
+    parser.add_argument("--quick", action="store_true", help="less iterations, for smoke runs")
+    parser.add_argument("--save", metavar="PATH", help="save report as JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare report with JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed throughput drop share (default 0.1)")
+    arguments = parser.parse_args()
+
+    logging.getLogger("motor-decorator").setLevel(logging.CRITICAL)
+
+    report = run(build_cases(arguments.quick), arguments.filter)
+    baseline = load(arguments.compare) if arguments.compare else None
+    print(format_report(report, baseline))
+
+    if arguments.save:
+        save(report, arguments.save)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, arguments.threshold)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
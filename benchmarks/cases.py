@@ -0,0 +1,242 @@
+"""Benchmark cases of controller hot paths"""
+import random
+import types
+from dataclasses import dataclass, field
+from typing import Callable, Awaitable, Self, Type
+
+from pymongo import UpdateOne
+
+from motor_decorator import MotorDecoratorBaseDB, MotorDecoratorAbstractView, extend_logs_info
+from motor_decorator.abstract_view import MotorDecoratorViewClass
+from motor_decorator.controller import MotorDecoratorController
+from motor_decorator.objects import MotorDecoratorCollectionName
+from motor_decorator.profiler import add_cluster
+
+from .fake import FakeDatabase, FakeCollection
+
+CLUSTER = "BENCHMARK"
+COLLECTION = "DOCUMENTS"
+
+DOCUMENT_COUNTS = (100, 1_000, 10_000)
+# Memory of pydantic views against compact record views
+MEMORY_DOCUMENTS = 100_000
+VIEW_SIZES = (4, 32)
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    library: Callable[[], Awaitable]
+    # Direct call of the stand-in layer doing the same work, to separate library overhead
+    raw: Callable[[], Awaitable] | None = None
+    setup: Callable[[], None] | None = None
+    iterations: int = 100
+    params: dict = field(default_factory=dict)
+
+
+class BenchmarkDB(MotorDecoratorBaseDB):
+    CLUSTER = CLUSTER
+    DATABASE = "BENCHMARK"
+
+
+def make_view(size: int) -> Type[MotorDecoratorAbstractView]:
+    annotations = {"id": int, **{f"field_{number}": int for number in range(size - 1)}}
+
+    def from_db(cls, data: dict) -> Self:
+        data["id"] = data.pop("_id")
+        return cls(**data)
+
+    namespace = {"__annotations__": annotations, "from_db": classmethod(from_db), "__module__": __name__}
+    return types.new_class(
+        f"BenchmarkView{size}",
+        (MotorDecoratorAbstractView,),
+        exec_body=lambda class_namespace: class_namespace.update(namespace)
+    )
+
+
+def make_documents(count: int, size: int, start: int = 0) -> list[dict]:
+    return [
+        {"_id": start + number, **{f"field_{field}": number * field for field in range(size - 1)}}
+        for number in range(count)
+    ]
+
+
+def make_db() -> tuple[BenchmarkDB, FakeCollection]:
+    add_cluster(CLUSTER, username="benchmark", password="benchmark", host="localhost", port=27017)
+    extend_logs_info(False)
+
+    db = BenchmarkDB()
+    db.controller._database = FakeDatabase()
+    db.controller._init_collection(MotorDecoratorCollectionName(COLLECTION))
+    return db, db.controller.collection
+
+
+def _iterations(documents: int, budget: int = 20_000, maximum: int = 1_000) -> int:
+    return max(5, min(maximum, budget // documents))
+
+
+def build_cases(quick: bool = False) -> list[BenchmarkCase]:
+    db, collection = make_db()
+    controller: MotorDecoratorController = db.controller
+    budget = 2_000 if quick else 20_000
+    cases = []
+
+    for size in VIEW_SIZES:
+        view_class = make_view(size)
+        record_class = view_class.record_view()
+        projection = view_class.projection()
+        single = make_documents(1, size)[0]
+        entity = dict(single)
+
+        cases.append(BenchmarkCase(
+            name=f"projection[view={size}]",
+            library=_sync(view_class.projection),
+            iterations=budget,
+            params={"view": size}
+        ))
+        cases.append(BenchmarkCase(
+            name=f"wrap_entity[view={size}]",
+            library=_sync(lambda view_class=view_class, entity=entity: controller._wrap_entity(view_class, dict(entity))),
+            raw=_sync(lambda view_class=view_class, entity=entity: view_class.from_db(dict(entity))),
+            iterations=budget,
+            params={"view": size}
+        ))
+        cases.append(BenchmarkCase(
+            name=f"insert_one[view={size}]",
+            library=lambda single=single: controller.do_insert_one(_without_id(single)),
+            raw=lambda single=single: collection.insert_one(_without_id(single)),
+            setup=lambda: collection.load([]),
+            iterations=budget // 10,
+            params={"view": size}
+        ))
+
+        for count in DOCUMENT_COUNTS:
+            documents = make_documents(count, size)
+            params = {"documents": count, "view": size}
+            iterations = _iterations(count, budget)
+
+            def load(documents: list[dict] = documents) -> None:
+                collection.load(documents)
+
+            def fresh_documents(count: int = count, size: int = size) -> list[dict]:
+                return [_without_id(document) for document in make_documents(count, size)]
+
+            def updates(count: int = count) -> list[UpdateOne]:
+                return [
+                    UpdateOne({"_id": number}, {"$set": {"field_0": random.random()}}, upsert=True)
+                    for number in range(count)
+                ]
+
+            cases.extend([
+                BenchmarkCase(
+                    name=f"insert_many[documents={count},view={size}]",
+                    library=lambda fresh_documents=fresh_documents: controller.do_insert_many(fresh_documents()),
+                    raw=lambda fresh_documents=fresh_documents: collection.insert_many(fresh_documents()),
+                    setup=lambda: collection.load([]),
+                    iterations=iterations,
+                    params=params
+                ),
+                BenchmarkCase(
+                    name=f"update_one[documents={count},view={size}]",
+                    library=lambda count=count: controller.do_update_one(
+                        {"_id": count // 2}, {"$set": {"field_0": random.random()}}
+                    ),
+                    raw=lambda count=count: collection.update_one(
+                        {"_id": count // 2}, {"$set": {"field_0": random.random()}}
+                    ),
+                    setup=load,
+                    iterations=_iterations(count, budget * 10),
+                    params=params
+                ),
+                BenchmarkCase(
+                    name=f"bulk_write[documents={count},view={size}]",
+                    library=lambda updates=updates: controller.do_bulk_write(updates()),
+                    raw=lambda updates=updates: collection.bulk_write(updates()),
+                    setup=load,
+                    iterations=max(5, iterations // 10),
+                    params=params
+                ),
+                BenchmarkCase(
+                    name=f"find_many_raw[documents={count},view={size}]",
+                    library=lambda projection=projection: controller.do_find_many({}, projection),
+                    raw=lambda projection=projection: _collect(collection.find({}, projection)),
+                    setup=load,
+                    iterations=iterations,
+                    params=params
+                ),
+                BenchmarkCase(
+                    name=f"find_many_view[documents={count},view={size}]",
+                    library=lambda projection=projection, view_class=view_class: controller.do_find_many(
+                        {}, projection, view_class
+                    ),
+                    raw=lambda projection=projection, view_class=view_class: _collect(
+                        collection.find({}, projection), view_class
+                    ),
+                    setup=load,
+                    iterations=iterations,
+                    params=params
+                ),
+                BenchmarkCase(
+                    name=f"find_many_record[documents={count},view={size}]",
+                    library=lambda projection=projection, record_class=record_class: controller.do_find_many(
+                        {}, projection, record_class
+                    ),
+                    raw=lambda projection=projection, record_class=record_class: _collect(
+                        collection.find({}, projection), record_class
+                    ),
+                    setup=load,
+                    iterations=iterations,
+                    params=params
+                ),
+                BenchmarkCase(
+                    name=f"aggregate_view[documents={count},view={size}]",
+                    library=lambda view_class=view_class: controller.do_aggregate(
+                        [{"$match": {"field_0": {"$gte": 0}}}], view_class
+                    ),
+                    raw=lambda view_class=view_class: _collect(
+                        collection.aggregate([{"$match": {"field_0": {"$gte": 0}}}]), view_class
+                    ),
+                    setup=load,
+                    iterations=iterations,
+                    params=params
+                ),
+            ])
+
+        memory_documents = make_documents(MEMORY_DOCUMENTS, size)
+        for kind, view in (("pydantic", view_class), ("record", record_class)):
+            cases.append(BenchmarkCase(
+                name=f"view_memory[kind={kind},documents={MEMORY_DOCUMENTS},view={size}]",
+                library=lambda projection=projection, view=view: controller.do_find_many({}, projection, view),
+                setup=lambda memory_documents=memory_documents: collection.load(memory_documents),
+                iterations=1,
+                params={"documents": MEMORY_DOCUMENTS, "view": size, "kind": kind}
+            ))
+
+    cases.append(BenchmarkCase(
+        name="retry_wrapper",
+        library=lambda: controller._execute(_noop),
+        raw=_noop,
+        iterations=budget * 5,
+    ))
+    return cases
+
+
+def _without_id(document: dict) -> dict:
+    return {key: value for key, value in document.items() if key != "_id"}
+
+
+async def _noop() -> None:
+    return None
+
+
+async def _collect(cursor, view_class: MotorDecoratorViewClass | None = None) -> list:
+    if view_class is None:
+        return [document async for document in cursor]
+    return [view_class.from_db(document) async for document in cursor]
+
+
+def _sync(function: Callable) -> Callable[[], Awaitable]:
+    async def wrap():
+        return function()
+
+    return wrap
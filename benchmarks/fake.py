@@ -0,0 +1,217 @@
+"""
+In-process stand-in of motor collection layer. It keeps documents in memory and implements
+ only the calls and query operators used by benchmarks, without any network round trips
+"""
+import copy
+from typing import Any, AsyncIterator
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, BulkWriteResult, DeleteResult
+
+_COMPARISON = {
+    "$eq": lambda value, arg: value == arg,
+    "$ne": lambda value, arg: value != arg,
+    "$gt": lambda value, arg: value is not None and value > arg,
+    "$gte": lambda value, arg: value is not None and value >= arg,
+    "$lt": lambda value, arg: value is not None and value < arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+    "$in": lambda value, arg: value in arg,
+    "$nin": lambda value, arg: value not in arg,
+}
+
+
+def matches(document: dict, condition: dict) -> bool:
+    for field, expected in condition.items():
+        if field == "$and":
+            if not all(matches(document, sub_condition) for sub_condition in expected):
+                return False
+            continue
+        if field == "$or":
+            if not any(matches(document, sub_condition) for sub_condition in expected):
+                return False
+            continue
+
+        value = document.get(field)
+        if isinstance(expected, dict) and expected and all(key.startswith("$") for key in expected):
+            if not all(_COMPARISON[operator](value, arg) for operator, arg in expected.items()):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def project(document: dict, projection: dict | None) -> dict:
+    if not projection:
+        return copy.copy(document)
+    include_id = projection.get("_id", 1)
+    result = {field: document[field] for field, flag in projection.items() if flag and field in document}
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def apply_update(document: dict, update: dict) -> bool:
+    changed = False
+    for field, value in update.get("$set", {}).items():
+        if document.get(field) != value:
+            document[field] = value
+            changed = True
+    for field, value in update.get("$inc", {}).items():
+        document[field] = document.get(field, 0) + value
+        changed = True
+    return changed
+
+
+class FakeCursor:
+    def __init__(self, documents: list[dict]) -> None:
+        self._documents = documents
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[dict]:
+        for document in self._documents:
+            yield document
+
+
+class FakeCollection:
+    def __init__(self, name: str, database_name: str = "BENCHMARK") -> None:
+        self.name = name
+        self.full_name = f"{database_name}.{name}"
+        self.documents: list[dict] = []
+        # Primary key index, so benchmarks of '_id' lookups don't measure collection scan
+        self._by_id: dict[Any, dict] = dict()
+
+    def load(self, documents: list[dict]) -> None:
+        self.documents = []
+        self._by_id = dict()
+        for document in documents:
+            self._append(dict(document))
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        self._append(dict(document))
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: list[dict], ordered: bool = True, **kwargs) -> InsertManyResult:
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self._append(dict(document))
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return self._update(filter, update, upsert, many=False)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return self._update(filter, update, upsert, many=True)
+
+    async def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        for document in self._candidates(filter):
+            if matches(document, filter):
+                self.documents.remove(document)
+                self._by_id.pop(document["_id"], None)
+                return DeleteResult({"n": 1}, True)
+        return DeleteResult({"n": 0}, True)
+
+    async def bulk_write(self, requests: list, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        inserted = matched = modified = deleted = 0
+        upserted = []
+        for request in requests:
+            if isinstance(request, InsertOne):
+                document = request._doc
+                document.setdefault("_id", ObjectId())
+                self._append(dict(document))
+                inserted += 1
+            elif isinstance(request, UpdateOne):
+                result = self._update(request._filter, request._doc, request._upsert, many=False)
+                matched += result.matched_count
+                modified += result.modified_count
+                if result.upserted_id is not None:
+                    upserted.append({"index": len(upserted), "_id": result.upserted_id})
+            elif isinstance(request, DeleteOne):
+                deleted += (await self.delete_one(request._filter)).deleted_count
+        return BulkWriteResult(
+            {
+                "nInserted": inserted,
+                "nUpserted": len(upserted),
+                "nMatched": matched,
+                "nModified": modified,
+                "nRemoved": deleted,
+                "upserted": upserted,
+            },
+            True
+        )
+
+    def find(self, filter: dict | None = None, projection: dict | None = None, limit: int = 0, **kwargs) -> FakeCursor:
+        documents = [project(document, projection) for document in self.documents if matches(document, filter or {})]
+        return FakeCursor(documents[:limit] if limit else documents)
+
+    async def find_one(self, filter: dict | None = None, projection: dict | None = None, **kwargs) -> dict | None:
+        for document in self._candidates(filter or {}):
+            if matches(document, filter or {}):
+                return project(document, projection)
+        return None
+
+    def aggregate(self, pipeline: list[dict], **kwargs) -> FakeCursor:
+        documents = self.documents
+        for stage in pipeline:
+            if "$match" in stage:
+                documents = [document for document in documents if matches(document, stage["$match"])]
+            elif "$project" in stage:
+                documents = [project(document, stage["$project"]) for document in documents]
+            elif "$limit" in stage:
+                documents = documents[:stage["$limit"]]
+        return FakeCursor([copy.copy(document) for document in documents])
+
+    async def count_documents(self, filter: dict, **kwargs) -> int:
+        return sum(1 for document in self.documents if matches(document, filter))
+
+    def list_indexes(self) -> FakeCursor:
+        return FakeCursor([])
+
+    def _update(self, condition: dict, update: dict, upsert: bool, many: bool) -> UpdateResult:
+        matched = modified = 0
+        for document in self._candidates(condition):
+            if matches(document, condition):
+                matched += 1
+                modified += apply_update(document, update)
+                if not many:
+                    break
+
+        upserted_id = None
+        if not matched and upsert:
+            document = {field: value for field, value in condition.items() if not field.startswith("$")}
+            apply_update(document, update)
+            upserted_id = document.setdefault("_id", ObjectId())
+            self._append(document)
+
+        raw_result: dict[str, Any] = {"n": matched or int(upserted_id is not None), "nModified": modified}
+        if upserted_id is not None:
+            raw_result["upserted"] = upserted_id
+        return UpdateResult(raw_result, True)
+
+    def _append(self, document: dict) -> None:
+        self.documents.append(document)
+        self._by_id[document["_id"]] = document
+
+    def _candidates(self, condition: dict) -> list[dict]:
+        identifier = condition.get("_id")
+        if identifier is not None and not isinstance(identifier, dict):
+            document = self._by_id.get(identifier)
+            return [document] if document is not None else []
+        return self.documents
+
+
+class FakeDatabase:
+    def __init__(self, name: str = "BENCHMARK") -> None:
+        self.name = name
+        self._collections: dict[str, FakeCollection] = dict()
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name, self.name)
+        return self._collections[name]
+
+    async def list_collection_names(self) -> list[str]:
+        return list(self._collections)
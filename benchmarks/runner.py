@@ -0,0 +1,134 @@
+"""Timing, memory measuring and baseline comparison of benchmark cases"""
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Awaitable
+
+from .cases import BenchmarkCase
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    position = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[position]
+
+
+async def _measure(function: Callable[[], Awaitable], iterations: int) -> dict:
+    # Warm up caches of pydantic, motor decorator and interpreter
+    for _ in range(min(iterations, 10)):
+        await function()
+
+    gc.collect()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        await function()
+        samples.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": _percentile(samples, 50) * 1e6,
+        "p99_us": _percentile(samples, 99) * 1e6,
+    }
+
+
+async def _peak_memory(function: Callable[[], Awaitable]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        await function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+async def run_case(case: BenchmarkCase) -> dict:
+    if case.setup is not None:
+        case.setup()
+    result = await _measure(case.library, case.iterations)
+    result["peak_memory_kb"] = await _peak_memory(case.library)
+    result["params"] = case.params
+
+    if case.raw is not None:
+        if case.setup is not None:
+            case.setup()
+        raw = await _measure(case.raw, case.iterations)
+        result["raw_p50_us"] = raw["p50_us"]
+        result["overhead_pct"] = (result["p50_us"] / raw["p50_us"] - 1) * 100 if raw["p50_us"] else 0.0
+    return result
+
+
+async def run_cases(cases: list[BenchmarkCase], pattern: str | None = None) -> dict:
+    results = {}
+    for case in cases:
+        if pattern and pattern not in case.name:
+            continue
+        results[case.name] = await run_case(case)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def run(cases: list[BenchmarkCase], pattern: str | None = None) -> dict:
+    return asyncio.run(run_cases(cases, pattern))
+
+
+def save(report: dict, path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Cases which throughput dropped below baseline by more than threshold share"""
+    regressions = []
+    for name, result in report["results"].items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        ratio = result["ops_per_sec"] / expected["ops_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:.1f} ops/sec vs baseline {expected['ops_per_sec']:.1f}"
+                f" ({(ratio - 1) * 100:+.1f}%)"
+            )
+    return regressions
+
+
+def format_report(report: dict, baseline: dict | None = None) -> str:
+    header = (
+        f"{'case':<48} {'ops/sec':>12} {'p50 us':>10} {'p99 us':>10} {'peak KiB':>10} {'overhead':>9}"
+        + (f" {'vs base':>8}" if baseline else "")
+    )
+    lines = [header, "-" * len(header)]
+    for name, result in report["results"].items():
+        overhead = f"{result['overhead_pct']:+.0f}%" if "overhead_pct" in result else "-"
+        line = (
+            f"{name:<48} {result['ops_per_sec']:>12.1f} {result['p50_us']:>10.1f} {result['p99_us']:>10.1f}"
+            f" {result['peak_memory_kb']:>10.1f} {overhead:>9}"
+        )
+        if baseline:
+            expected = baseline["results"].get(name)
+            change = f"{(result['ops_per_sec'] / expected['ops_per_sec'] - 1) * 100:+.1f}%" if expected else "new"
+            line += f" {change:>8}"
+        lines.append(line)
+    return "\n".join(lines)
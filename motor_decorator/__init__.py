@@ -1,4 +1,22 @@
-from .abstract_view import MotorDecoratorAbstractView
+from .abstract_view import MotorDecoratorAbstractView, MotorDecoratorRecordView
 from .base_db import MotorDecoratorBaseDB, init_collection
-from .objects import MotorDecoratorIndex
-from .profiler import add_cluster, profile_clusters, change_log_level, extend_logs_info
+from .objects import (
+    MotorDecoratorIndex,
+    MotorDecoratorQueryParam,
+    MotorDecoratorPriority,
+    MotorDecoratorBreakerParameters,
+    MotorDecoratorTTLIndex,
+    MotorDecoratorTimeSeries
+)
+from .deadline import call_deadline
+from .fanout import MotorDecoratorFanOut
+from .limiter import call_priority
+from .query import MotorDecoratorQuery
+from .profiler import (
+    add_cluster,
+    profile_clusters,
+    change_log_level,
+    extend_logs_info,
+    throttle_error_logs,
+    advise_indexes
+)
@@ -1,8 +1,12 @@
+import copy
+import functools
 from abc import ABC, abstractmethod
-from typing import Self
+from typing import Any, Callable, ClassVar, Self, Type, get_origin
 
 from pydantic import BaseModel, ConfigDict
 
+_MISSING = object()
+
 
 class MotorDecoratorAbstractView(ABC, BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True, extra="forbid")
@@ -20,3 +24,173 @@ class MotorDecoratorAbstractView(ABC, BaseModel):
         else:
             projection["_id"] = 0
         return projection
+
+    @classmethod
+    def record_view(cls) -> Type["MotorDecoratorRecordView"]:
+        """Compact record class with fields of the view, it is generated once per view"""
+        record_view = _record_views.get(cls)
+        if record_view is None:
+            record_view = _RecordViewMeta(
+                f"{cls.__name__}Record", (MotorDecoratorRecordView,), {"__module__": cls.__module__}, view=cls
+            )
+            _record_views[cls] = record_view
+        return record_view
+
+
+_record_views: dict[Type[MotorDecoratorAbstractView], Type["MotorDecoratorRecordView"]] = dict()
+
+
+class _RecordViewMeta(type):
+    """Turns annotations (own or of linked pydantic view) into '__slots__' and caches projection"""
+
+    def __new__(mcs, name: str, bases: tuple, namespace: dict, view: Type[MotorDecoratorAbstractView] | None = None):
+        inherited_fields: tuple[str, ...] = ()
+        defaults: dict[str, Any] = dict()
+        factories: dict[str, Callable[[], Any]] = dict()
+        for base in reversed(bases):
+            inherited_fields += tuple(
+                field for field in getattr(base, "__record_fields__", ()) if field not in inherited_fields
+            )
+            defaults.update(getattr(base, "__record_defaults__", {}))
+            factories.update(getattr(base, "__record_factories__", {}))
+            view = view or getattr(base, "__record_view__", None)
+
+        if view is not None and not inherited_fields and "__annotations__" not in namespace:
+            fields = tuple(view.model_fields)
+            for field, info in view.model_fields.items():
+                if info.default_factory is not None:
+                    factories[field] = info.default_factory
+                elif not info.is_required():
+                    _set_default(field, info.default, defaults, factories)
+        else:
+            fields = tuple(
+                field for field, annotation in namespace.get("__annotations__", {}).items()
+                if not _is_class_var(annotation) and field not in inherited_fields
+            )
+            for field in fields:
+                # Slot can't coexist with class attribute of the same name
+                if (default := namespace.pop(field, _MISSING)) is not _MISSING:
+                    _set_default(field, default, defaults, factories)
+
+        namespace["__slots__"] = tuple(field for field in fields if field not in inherited_fields)
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls.__record_fields__ = inherited_fields + namespace["__slots__"]
+        cls.__record_defaults__ = defaults
+        cls.__record_factories__ = factories
+        cls.__record_sources__ = tuple(
+            (field, "_id" if field == "id" else field, defaults.get(field, _MISSING), factories.get(field))
+            for field in cls.__record_fields__
+        )
+        cls.__record_view__ = view
+        cls.__record_projection__ = view.projection() if view is not None else _projection(cls.__record_fields__)
+        return cls
+
+
+def _set_default(field: str, default: Any, defaults: dict[str, Any], factories: dict[str, Callable[[], Any]]) -> None:
+    """Mutable default is copied for every record like pydantic does, immutable one is shared"""
+    defaults.pop(field, None)
+    factories.pop(field, None)
+    try:
+        hash(default)
+    except TypeError:
+        factories[field] = functools.partial(copy.deepcopy, default)
+    else:
+        defaults[field] = default
+
+
+def _is_class_var(annotation: Any) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(("ClassVar", "typing.ClassVar"))
+    return annotation is ClassVar or get_origin(annotation) is ClassVar
+
+
+def _projection(fields: tuple[str, ...]) -> dict:
+    projection = {field: 1 for field in fields}
+    if "id" in projection:
+        projection["_id"] = projection.pop("id")
+    else:
+        projection["_id"] = 0
+    return projection
+
+
+class MotorDecoratorRecordView(metaclass=_RecordViewMeta):
+    """
+    Compact read-only alternative of pydantic view for read-heavy queries: '__slots__' record
+     without validation, generated from annotations or from linked pydantic view:
+
+        class VendorRecord(MotorDecoratorRecordView, view=VendorDatabaseView): ...
+        VendorRecord = VendorDatabaseView.record_view()
+
+    Default 'from_db' takes fields by name and '_id' as 'id', missing required field raises TypeError
+     like in '__init__'. 'to_view' builds validated pydantic view by 'from_db' of the view
+    """
+    __slots__ = ()
+    __record_fields__: ClassVar[tuple[str, ...]]
+    __record_defaults__: ClassVar[dict[str, Any]]
+    __record_factories__: ClassVar[dict[str, Callable[[], Any]]]
+    __record_sources__: ClassVar[tuple[tuple[str, str, Any, Callable[[], Any] | None], ...]]
+    __record_view__: ClassVar[Type[MotorDecoratorAbstractView] | None]
+    __record_projection__: ClassVar[dict]
+
+    def __init__(self, **fields: Any) -> None:
+        defaults = self.__record_defaults__
+        factories = self.__record_factories__
+        for field in self.__record_fields__:
+            value = fields.get(field, _MISSING)
+            if value is _MISSING:
+                if field in factories:
+                    value = factories[field]()
+                elif field in defaults:
+                    value = defaults[field]
+                else:
+                    raise TypeError(f"{self.__class__.__name__} missing required field '{field}'")
+            object.__setattr__(self, field, value)
+
+    @classmethod
+    def from_db(cls, data: dict) -> Self:
+        record = cls.__new__(cls)
+        for field, source, default, factory in cls.__record_sources__:
+            value = data.get(source, _MISSING)
+            if value is _MISSING:
+                if factory is not None:
+                    value = factory()
+                elif default is _MISSING:
+                    raise TypeError(f"{cls.__name__} missing required field '{field}'")
+                else:
+                    value = default
+            object.__setattr__(record, field, value)
+        return record
+
+    @classmethod
+    def projection(cls) -> dict:
+        return dict(cls.__record_projection__)
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__record_fields__}
+
+    def to_db(self) -> dict:
+        """Fields by their names in the document, 'id' as '_id'"""
+        return {source: getattr(self, field) for field, source, _, _ in self.__record_sources__}
+
+    def to_view(self) -> MotorDecoratorAbstractView:
+        """Pydantic view is built by its own 'from_db', so view which reshapes the document gets the same input"""
+        if self.__record_view__ is None:
+            raise TypeError(f"{self.__class__.__name__} is not linked with pydantic view")
+        return self.__record_view__.from_db(self.to_db())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is read-only")
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, MotorDecoratorRecordView):
+            return self.__class__ is other.__class__ and self.to_dict() == other.to_dict()
+        return False
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__record_fields__)
+        return f"{self.__class__.__name__}({fields})"
+
+
+MotorDecoratorViewClass = Type[MotorDecoratorAbstractView] | Type[MotorDecoratorRecordView]
@@ -0,0 +1,204 @@
+import functools
+from contextvars import ContextVar
+from typing import Callable, Any
+
+from pymongo.errors import OperationFailure
+
+from .objects import MotorDecoratorIndex, MotorDecoratorQueryShapeStats, MotorDecoratorIndexAdvice
+
+__all__ = ["MotorDecoratorQueryAdvisor", "observe_query", "auto_hinted", "is_rejected_hint"]
+
+_IndexKeys = list[tuple[str, int]]
+# (cluster name, "database.collection")
+_Namespace = tuple[str, str]
+
+_EQUALITY_OPERATORS = frozenset({"$eq", "$in"})
+
+# Set while query runs with hint added by advisor, so rejected hint is raised by retry decorator instead of retries
+auto_hinted: ContextVar[bool] = ContextVar("motor_decorator_auto_hinted", default=False)
+
+
+def is_rejected_hint(ex: BaseException) -> bool:
+    """Server error 'hint provided does not correspond to an existing index' (BadValue)"""
+    return isinstance(ex, OperationFailure) and ex.code == 2 and "hint" in str(ex).lower()
+
+
+def observe_query(func: Callable) -> Callable:
+    """Decorator for controller 'do_*' methods which take condition as first argument"""
+
+    @functools.wraps(func)
+    async def wrap(self, condition: dict, *args, **kwargs) -> Any:
+        if self.QUERY_ADVISOR is False and self.AUTO_HINT is False:
+            return await func(self, condition, *args, **kwargs)
+        return await self._observe_query(func, condition, *args, **kwargs)
+
+    return wrap
+
+
+class MotorDecoratorQueryAdvisor:
+    """
+    Collects normalized shapes (equality, sort and range fields) of queries per collection
+     and matches them against cached indexes metadata to find shapes without supporting index
+    """
+
+    def __init__(self) -> None:
+        self._shapes: dict[_Namespace, dict[str, MotorDecoratorQueryShapeStats]] = dict()
+        self._indexes: dict[_Namespace, list[_IndexKeys]] = dict()
+        self._hints: dict[tuple[_Namespace, str], _IndexKeys | None] = dict()
+
+    def shape(self, condition: dict, sort: Any = None) -> tuple[str, MotorDecoratorQueryShapeStats]:
+        equality: set[str] = set()
+        ranges: set[str] = set()
+        self._parse_condition(condition, equality, ranges)
+        sort_keys = self._parse_sort(sort)
+        ranges -= equality
+
+        stats = MotorDecoratorQueryShapeStats(
+            equality=tuple(sorted(equality)),
+            sort=sort_keys,
+            range=tuple(sorted(ranges))
+        )
+        key = f"eq={list(stats.equality)};sort={list(stats.sort)};range={list(stats.range)}"
+        return key, stats
+
+    def observe(self, namespace: _Namespace, key: str, stats: MotorDecoratorQueryShapeStats, latency: float) -> None:
+        shapes = self._shapes.setdefault(namespace, dict())
+        stats = shapes.setdefault(key, stats)
+        stats.observe(latency)
+
+    def has_indexes(self, namespace: _Namespace) -> bool:
+        return namespace in self._indexes
+
+    def set_indexes(self, namespace: _Namespace, indexes: list[dict]) -> None:
+        """Cache indexes metadata from 'list_indexes' response"""
+        usable_indexes = []
+        for index in indexes:
+            # Partial and sparse indexes can return incomplete results for hinted query, hidden index can't be hinted
+            if index.get("partialFilterExpression") or index.get("sparse") or index.get("hidden"):
+                continue
+            keys = list(index["key"].items())
+            if all(isinstance(direction, (int, float)) for _, direction in keys):
+                usable_indexes.append([(field, int(direction)) for field, direction in keys])
+
+        self._indexes[namespace] = usable_indexes
+        self._hints = {key: hint for key, hint in self._hints.items() if key[0] != namespace}
+
+    def invalidate(self, namespace: _Namespace) -> None:
+        self._indexes.pop(namespace, None)
+        self._hints = {key: hint for key, hint in self._hints.items() if key[0] != namespace}
+
+    def namespaces(self, cluster: str | None = None) -> list[_Namespace]:
+        return [namespace for namespace in self._shapes if cluster is None or namespace[0] == cluster]
+
+    def hint(self, namespace: _Namespace, key: str, stats: MotorDecoratorQueryShapeStats) -> _IndexKeys | None:
+        """Best known index for query shape or None if indexes are not cached or shape has no supporting index"""
+        indexes = self._indexes.get(namespace)
+        if indexes is None:
+            return None
+
+        cache_key = (namespace, key)
+        if cache_key not in self._hints:
+            self._hints[cache_key] = self._best_index(stats, indexes)
+        return self._hints[cache_key]
+
+    def report(self, cluster: str | None = None) -> list[MotorDecoratorIndexAdvice]:
+        """Shapes without supporting index in cached metadata, sorted by cumulative latency"""
+        advices = []
+        for namespace in self.namespaces(cluster):
+            indexes = self._indexes.get(namespace)
+            if indexes is None:
+                continue
+
+            for key, stats in self._shapes[namespace].items():
+                if not (stats.equality or stats.sort or stats.range):
+                    continue
+                if self._best_index(stats, indexes) is not None:
+                    continue
+
+                advices.append(
+                    MotorDecoratorIndexAdvice(
+                        cluster=namespace[0],
+                        namespace=namespace[1],
+                        shape=key,
+                        calls=stats.calls,
+                        total_latency=stats.total_latency,
+                        suggested_index=self._suggest_index(stats),
+                        exist_indexes=indexes
+                    )
+                )
+        return sorted(advices, key=lambda advice: advice.total_latency, reverse=True)
+
+    def reset(self) -> None:
+        self._shapes.clear()
+        self._indexes.clear()
+        self._hints.clear()
+
+    @classmethod
+    def _parse_condition(cls, condition: dict, equality: set[str], ranges: set[str]) -> None:
+        for field, value in condition.items():
+            if field == "$and":
+                for sub_condition in value:
+                    cls._parse_condition(sub_condition, equality, ranges)
+            elif field.startswith("$"):
+                # $or, $expr, $text and others can't use a single index prefix
+                continue
+            elif isinstance(value, dict) and value and all(key.startswith("$") for key in value):
+                if value.keys() <= _EQUALITY_OPERATORS:
+                    equality.add(field)
+                else:
+                    ranges.add(field)
+            else:
+                equality.add(field)
+
+    @staticmethod
+    def _parse_sort(sort: Any) -> tuple[tuple[str, int], ...]:
+        if not sort:
+            return tuple()
+        elif isinstance(sort, str):
+            return (sort, 1),
+        elif isinstance(sort, dict):
+            sort = sort.items()
+        return tuple((key, 1) if isinstance(key, str) else (key[0], int(key[1])) for key in sort)
+
+    @staticmethod
+    def _index_score(stats: MotorDecoratorQueryShapeStats, index: _IndexKeys) -> int:
+        """Count of index keys usable by query shape following equality-sort-range rule"""
+        position = 0
+        while position < len(index) and index[position][0] in stats.equality:
+            position += 1
+
+        if stats.sort:
+            # Index can be scanned forward or backward
+            sort_direction = None
+            for field, direction in stats.sort:
+                if field in stats.equality:
+                    continue
+                if position >= len(index) or index[position][0] != field:
+                    break
+                relative_direction = index[position][1] * direction
+                if sort_direction is None:
+                    sort_direction = relative_direction
+                elif sort_direction != relative_direction:
+                    break
+                position += 1
+
+        if position < len(index) and index[position][0] in stats.range:
+            position += 1
+        return position
+
+    @classmethod
+    def _best_index(cls, stats: MotorDecoratorQueryShapeStats, indexes: list[_IndexKeys]) -> _IndexKeys | None:
+        best_index, best_score = None, 0
+        for index in indexes:
+            score = cls._index_score(stats, index)
+            if score > best_score or (score == best_score and best_index and len(index) < len(best_index)):
+                best_index, best_score = index, score
+        return best_index if best_score else None
+
+    @staticmethod
+    def _suggest_index(stats: MotorDecoratorQueryShapeStats) -> MotorDecoratorIndex:
+        sort_fields = {field for field, _ in stats.sort}
+        keys = [field for field in stats.equality if field not in sort_fields]
+        keys.extend(stats.sort)
+        keys.extend(field for field in stats.range if field not in sort_fields)
+        return MotorDecoratorIndex(*keys)
@@ -1,12 +1,16 @@
-from typing import Callable, Any
+from types import TracebackType
+from typing import Callable, Any, Self, Type
 
 from .controller import MotorDecoratorController
+from .exception import MotorDecoratorValueError
 from .objects import (
     MotorDecoratorClusterName,
     MotorDecoratorDatabaseName,
     MotorDecoratorIndex,
-    MotorDecoratorCollectionName
+    MotorDecoratorCollectionName,
+    MotorDecoratorTimeSeries
 )
+from .timeseries import MotorDecoratorTimeSeriesWriter
 
 
 def init_collection(collection_name: str, check_existence: bool = False) -> Callable:
@@ -28,13 +32,50 @@ def init_collection(collection_name: str, check_existence: bool = False) -> Call
 
 
 class MotorDecoratorBaseDB:
+    """
+    Controller and its client are created on the first use of the db object.
+    Use 'async with VendorDB() as db:' or 'await db.close()' for closing of the client.
+    Declared time-series collections and indexes are created on the first 'async with' of the db class
+     or by 'init_declarations'
+    """
     CLUSTER: str
     DATABASE: str
+    TIME_SERIES: tuple[MotorDecoratorTimeSeries, ...] = ()
+    INDEXES: dict[str, tuple[MotorDecoratorIndex, ...]] = dict()
+    _controller: MotorDecoratorController | None = None
+    _initialized_classes: set[type] = set()
 
     def __init__(self, test: bool = False) -> None:
-        cluster = MotorDecoratorClusterName(self.CLUSTER)
-        database = MotorDecoratorDatabaseName(self.DATABASE)
-        self.controller = MotorDecoratorController(cluster, database, test)
+        self._test = test
+
+    @property
+    def controller(self) -> MotorDecoratorController:
+        if self._controller is None:
+            cluster = MotorDecoratorClusterName(self.CLUSTER)
+            database = MotorDecoratorDatabaseName(self.DATABASE)
+            self._controller = MotorDecoratorController(cluster, database, self._test)
+        return self._controller
+
+    @controller.setter
+    def controller(self, controller: MotorDecoratorController) -> None:
+        self._controller = controller
+
+    async def __aenter__(self) -> Self:
+        if (self.TIME_SERIES or self.INDEXES) and type(self) not in self._initialized_classes:
+            await self.init_declarations()
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._controller is not None:
+            self._controller.close()
 
     async def check_indexes(self, *indexes: MotorDecoratorIndex) -> None:
         await self.controller.check_indexes(*indexes)
@@ -42,3 +83,19 @@ class MotorDecoratorBaseDB:
     async def init_collection(self, collection_name: str, check_existence: bool = False) -> None:
         collection = MotorDecoratorCollectionName(collection_name)
         await self.controller(collection, check_existence)
+
+    async def init_declarations(self) -> None:
+        """Create declared time-series collections and indexes which don't exist"""
+        for time_series in self.TIME_SERIES:
+            await self.controller.create_time_series(time_series)
+        for collection_name, indexes in self.INDEXES.items():
+            await self.init_collection(collection_name)
+            await self.check_indexes(*indexes)
+        self._initialized_classes.add(type(self))
+
+    def time_series_writer(self, collection_name: str, **kwargs) -> MotorDecoratorTimeSeriesWriter:
+        """Ingestion buffer of declared time-series collection, kwargs are options of the buffer"""
+        for time_series in self.TIME_SERIES:
+            if time_series.collection == collection_name:
+                return MotorDecoratorTimeSeriesWriter(self.controller, time_series, **kwargs)
+        raise MotorDecoratorValueError(f"Time-series collection '{collection_name}' is not declared")
@@ -0,0 +1,183 @@
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+
+from .deadline import remaining_time
+
+from .exception import (
+    MotorDecoratorCircuitOpenError,
+    MotorDecoratorDeadlineExceededError,
+    MotorDecoratorQueueOverflowError
+)
+from .objects import MotorDecoratorBreakerParameters, MotorDecoratorBreakerState, MotorDecoratorBreakerStats
+
+__all__ = ["MotorDecoratorCircuitBreaker", ]
+
+# Errors which mean that cluster is unavailable or overloaded, other errors are answers of working cluster
+_CLUSTER_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError, TimeoutError)
+# Rejections of the library itself and expired budget of the caller, they say nothing about the cluster
+_NEUTRAL_ERRORS = (MotorDecoratorQueueOverflowError, MotorDecoratorDeadlineExceededError)
+
+_StateListener = Callable[[str, MotorDecoratorBreakerState, MotorDecoratorBreakerState], None]
+
+
+class MotorDecoratorCircuitBreaker:
+    """
+    Circuit breaker of the cluster.
+    Opens after 'failure_threshold' consecutive cluster errors or when error rate in the window of last calls
+     exceeds 'error_rate_threshold'. While open calls fail fast with MotorDecoratorCircuitOpenError.
+    After 'recovery_timeout' seconds breaker is half-open and passes 'half_open_probes' calls:
+     success of all probes closes breaker, any probe failure opens it again.
+    Timeout of call with deadline shorter than 'response_timeout' (seconds) of the cluster is the expired budget
+     of the caller, it isn't counted
+    """
+
+    def __init__(
+            self,
+            name: str,
+            parameters: MotorDecoratorBreakerParameters,
+            logger: logging.Logger,
+            response_timeout: float | None = None
+    ) -> None:
+        self.name = name
+        self.parameters = parameters
+        self.response_timeout = response_timeout
+        self.logger = logger
+        self.stats = MotorDecoratorBreakerStats()
+        self._listeners: list[_StateListener] = []
+        self._window: deque[bool] = deque(maxlen=parameters.window_size)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, state={self.state.value})"
+
+    @property
+    def state(self) -> MotorDecoratorBreakerState:
+        return self.stats.state
+
+    @property
+    def is_open(self) -> bool:
+        return self.stats.state is MotorDecoratorBreakerState.OPEN
+
+    def add_listener(self, listener: _StateListener) -> None:
+        """Listener is called with cluster name, old and new state on every state transition"""
+        self._listeners.append(listener)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        self.before_call()
+        budget = remaining_time()
+        try:
+            yield
+        except _NEUTRAL_ERRORS:
+            self._release_probe()
+            raise
+        except _CLUSTER_ERRORS as ex:
+            if self._is_budget_timeout(ex, budget):
+                self._release_probe()
+            else:
+                self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        except BaseException:
+            # Cancelled call says nothing about the cluster
+            self._release_probe()
+            raise
+        else:
+            self.record_success()
+
+    def before_call(self) -> None:
+        state = self.stats.state
+        if state is MotorDecoratorBreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self.parameters.recovery_timeout:
+                self._reject()
+            self._transition(MotorDecoratorBreakerState.HALF_OPEN)
+            state = MotorDecoratorBreakerState.HALF_OPEN
+
+        if state is MotorDecoratorBreakerState.HALF_OPEN:
+            if self._probes_in_flight + self._probe_successes >= self.parameters.half_open_probes:
+                self._reject()
+            self._probes_in_flight += 1
+
+    def record_success(self) -> None:
+        self.stats.successes += 1
+        self._consecutive_failures = 0
+        self._window.append(True)
+
+        if self.stats.state is MotorDecoratorBreakerState.HALF_OPEN:
+            self._release_probe()
+            self._probe_successes += 1
+            if self._probe_successes >= self.parameters.half_open_probes:
+                self._window.clear()
+                self._transition(MotorDecoratorBreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        self.stats.failures += 1
+        self._consecutive_failures += 1
+        self._window.append(False)
+
+        state = self.stats.state
+        if state is MotorDecoratorBreakerState.HALF_OPEN:
+            self._release_probe()
+            self._open()
+        elif state is MotorDecoratorBreakerState.CLOSED:
+            if self._consecutive_failures >= self.parameters.failure_threshold or self._error_rate_exceeded():
+                self._open()
+
+    def _is_budget_timeout(self, ex: Exception, budget: float | None) -> bool:
+        # Driver derives 'maxTimeMS' and socket timeouts from the deadline, server and driver raise them
+        #  before asyncio timeout of the deadline
+        if budget is None or (self.response_timeout is not None and budget >= self.response_timeout):
+            return False
+        return isinstance(ex, TimeoutError) or (isinstance(ex, PyMongoError) and ex.timeout)
+
+    def _error_rate_exceeded(self) -> bool:
+        calls = len(self._window)
+        if calls < self.parameters.min_calls:
+            return False
+        failures = calls - sum(self._window)
+        return failures / calls >= self.parameters.error_rate_threshold
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(MotorDecoratorBreakerState.OPEN)
+
+    def _release_probe(self) -> None:
+        if self._probes_in_flight:
+            self._probes_in_flight -= 1
+
+    def _reject(self) -> None:
+        self.stats.rejected += 1
+        raise MotorDecoratorCircuitOpenError(f"Circuit breaker of '{self.name}' cluster is {self.stats.state.value}")
+
+    def _transition(self, new_state: MotorDecoratorBreakerState) -> None:
+        old_state = self.stats.state
+        self.stats.state = new_state
+        self.stats.last_transition = time.time()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        if new_state is MotorDecoratorBreakerState.OPEN:
+            self.stats.opened += 1
+            self.logger.warning(
+                "Circuit breaker of '%s' cluster is open for %ss after %d consecutive failures",
+                self.name, self.parameters.recovery_timeout, self._consecutive_failures
+            )
+        elif new_state is MotorDecoratorBreakerState.HALF_OPEN:
+            self.stats.half_opened += 1
+            self.logger.info("Circuit breaker of '%s' cluster is half-open, probing cluster", self.name)
+        else:
+            self.stats.closed += 1
+            self.logger.info("Circuit breaker of '%s' cluster is closed, cluster is available", self.name)
+
+        for listener in self._listeners:
+            listener(self.name, old_state, new_state)
@@ -1,15 +1,33 @@
 import asyncio
 import logging
-from typing import Type, Any, Callable
+import os
+import time
+from contextlib import asynccontextmanager, AsyncExitStack
+from contextvars import ContextVar
+from typing import Any, Callable, AsyncIterator, Iterable, Sequence
 
 from bson import ObjectId
-from motor.core import AgnosticCollection, AgnosticCursor, AgnosticCommandCursor, AgnosticDatabase, AgnosticClient
+from motor.core import (
+    AgnosticCollection,
+    AgnosticCursor,
+    AgnosticCommandCursor,
+    AgnosticDatabase,
+    AgnosticClient,
+    AgnosticClientSession
+)
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import UpdateOne, DeleteOne, InsertOne, ReturnDocument
+from pymongo.errors import CollectionInvalid, OperationFailure
 from pymongo.results import BulkWriteResult, DeleteResult, UpdateResult, InsertManyResult, InsertOneResult
 
-from .abstract_view import MotorDecoratorAbstractView
+from .abstract_view import MotorDecoratorAbstractView, MotorDecoratorRecordView, MotorDecoratorViewClass
+from .advisor import MotorDecoratorQueryAdvisor, observe_query, auto_hinted, is_rejected_hint
+from .breaker import MotorDecoratorCircuitBreaker
+from .deadline import call_within_deadline
+from .limiter import MotorDecoratorLimiter
 from .exception import (
+    MotorDecoratorBadHintError,
+    MotorDecoratorValueError,
     MotorDecoratorCollectionNotFoundError,
     MotorDecoratorViewError,
     MotorDecoratorClustersNotRegistered
@@ -20,25 +38,65 @@ from .objects import (
     MotorDecoratorCollectionName,
     MotorDecoratorIndex,
     MotorDecoratorRegisteredCluster,
-    MotorDecoratorRetryParameters
+    MotorDecoratorRetryParameters,
+    MotorDecoratorTransactionStats,
+    MotorDecoratorIndexAdvice,
+    MotorDecoratorSyncResult,
+    MotorDecoratorTimeSeries
 )
+from .query import MotorDecoratorQuery
 from .tools import db_tools
 
 logger = db_tools.get_logger()
 
+# Session of the current task, shared by all controllers which use the same client
+_current_session: ContextVar[AgnosticClientSession | None] = ContextVar("motor_decorator_session", default=None)
+
+_MISSING = object()
+
+# Incremented in the child process after fork, clients and handles of the parent generation are re-created
+_fork_generation = 0
+
+
+class _SharedClient:
+    """Client of the registered cluster shared by its controllers, it is closed by the last of them"""
+    __slots__ = ("client", "users")
+
+    def __init__(self, client: AgnosticClient) -> None:
+        self.client = client
+        self.users = 0
+
 
 class MotorDecoratorController:
     _clusters: dict[str, MotorDecoratorRegisteredCluster] = dict()
-    _client: AgnosticClient
-    _database: AgnosticDatabase
-    _collection: AgnosticCollection
+    _transaction_stats: dict[str, MotorDecoratorTransactionStats] = dict()
+    _advisor: MotorDecoratorQueryAdvisor = MotorDecoratorQueryAdvisor()
+    _limiters: dict[str, MotorDecoratorLimiter] = dict()
+    _shared_clients: dict[str, _SharedClient] = dict()
+    _shared_client: _SharedClient | None = None
+    _client_handle: AgnosticClient | None = None
+    _database_handle: AgnosticDatabase | None = None
+    _collection_handle: AgnosticCollection | None = None
+    _collection_name: str | None = None
+    _generation: int = 0
     logger: logging.Logger
     EXTENDED_LOGS: bool
     DATABASE_RETRIES: int
+    QUERY_ADVISOR: bool = False
+    AUTO_HINT: bool = False
 
     @classmethod
     def add_cluster(cls, cluster: MotorDecoratorRegisteredCluster) -> None:
+        if cluster.breaker_parameters is not None:
+            cluster.circuit_breaker = MotorDecoratorCircuitBreaker(
+                cluster.name, cluster.breaker_parameters, logger, response_timeout=cluster.timeout / 1000
+            )
         cls._clusters[cluster.name] = cluster
+        # Controllers which already use the client of the old registration keep it until close
+        cls._shared_clients.pop(cluster.name, None)
+        prefix = f"{cluster.name}/"
+        for name in [name for name in cls._limiters if name == cluster.name or name.startswith(prefix)]:
+            del cls._limiters[name]
 
     def __init__(
             self,
@@ -47,14 +105,11 @@ class MotorDecoratorController:
             test: bool,  # Then needs to mock db class which use controller
     ) -> None:
         cluster: MotorDecoratorRegisteredCluster = self._get_cluster(cluster_name)
-        self._client = AsyncIOMotorClient(
-            cluster.url,
-            serverSelectionTimeoutMS=cluster.timeout,
-            **cluster.kwargs
-        )
+        self._cluster_name = cluster.name
+        self._database_name = database_name
         self._is_test = test
-        self._init_database(database_name)
         self.logger = logger
+        self._generation = _fork_generation
 
     def _get_cluster(self, cluster_name: MotorDecoratorClusterName) -> MotorDecoratorRegisteredCluster:
         registered_cluster = self._clusters.get(cluster_name.name)
@@ -62,16 +117,101 @@ class MotorDecoratorController:
             raise MotorDecoratorClustersNotRegistered(f"Cluster with name '{cluster_name}' not exists")
         return registered_cluster
 
+    def _connect(self) -> None:
+        """
+        Client is created on the first use and re-created in the child process after fork.
+        Controllers of the cluster share one client, so session of the transaction reaches all of them
+        """
+        shared = self._shared_clients.get(self._cluster_name)
+        if shared is None:
+            cluster = self._get_cluster(MotorDecoratorClusterName(self._cluster_name))
+            shared = _SharedClient(
+                AsyncIOMotorClient(
+                    cluster.url,
+                    serverSelectionTimeoutMS=cluster.timeout,
+                    **cluster.kwargs
+                )
+            )
+            self._shared_clients[self._cluster_name] = shared
+            if self.EXTENDED_LOGS and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Client of '%s' cluster has been created in process %d", self._cluster_name, os.getpid()
+                )
+        if self._shared_client is not shared:
+            self._release_client()
+            shared.users += 1
+            self._shared_client = shared
+        self._client_handle = shared.client
+        self._generation = _fork_generation
+        self._init_database(self._database_name)
+        if self._collection_name is not None:
+            self._collection_handle = self._database_handle[self._collection_name]
+
     def _init_database(self, database_name: MotorDecoratorDatabaseName) -> None:
-        if isinstance(self._client, AgnosticClient):
-            self._database = self._client[database_name.name]
-            if self.EXTENDED_LOGS:
-                self.logger.debug(f"The '{database_name.name}' database has been initialized")
+        if isinstance(self._client_handle, AgnosticClient):
+            self._database_handle = self._client_handle[database_name.name]
+            if self.EXTENDED_LOGS and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("The '%s' database has been initialized", database_name.name)
 
         if self._is_test is False:
-            if not isinstance(self._database, AgnosticDatabase):
+            if not isinstance(self._database_handle, AgnosticDatabase):
                 raise AttributeError(f"Mongo DB cluster and database not set!")
 
+    @property
+    def _client(self) -> AgnosticClient:
+        if self._client_handle is None or self._generation != _fork_generation:
+            self._connect()
+        return self._client_handle
+
+    @property
+    def _database(self) -> AgnosticDatabase:
+        if self._database_handle is None or self._generation != _fork_generation:
+            self._connect()
+        return self._database_handle
+
+    @_database.setter
+    def _database(self, database: AgnosticDatabase) -> None:
+        self._database_handle = database
+
+    @property
+    def _collection(self) -> AgnosticCollection:
+        if self._database_handle is None or self._generation != _fork_generation:
+            self._connect()
+        if self._collection_handle is None:
+            raise AttributeError("Collection is not initialized, use 'init_collection' before queries")
+        return self._collection_handle
+
+    @_collection.setter
+    def _collection(self, collection: AgnosticCollection) -> None:
+        self._collection_handle = collection
+        self._collection_name = collection.name
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client_handle is not None and self._generation == _fork_generation
+
+    def close(self) -> None:
+        """Release client of the controller, client is closed when all controllers of the cluster are closed"""
+        if self._client_handle is not None:
+            self._release_client()
+            self._client_handle = None
+            self._database_handle = None
+            self._collection_handle = None
+
+    def _release_client(self) -> None:
+        shared, self._shared_client = self._shared_client, None
+        if shared is None or self._generation != _fork_generation:
+            # Client of the parent process is left to the parent
+            return
+        shared.users -= 1
+        if shared.users > 0:
+            return
+        shared.client.close()
+        if self._shared_clients.get(self._cluster_name) is shared:
+            del self._shared_clients[self._cluster_name]
+        if self.EXTENDED_LOGS and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Client of '%s' cluster has been closed", self._cluster_name)
+
     @classmethod
     def ping_clusters(cls) -> None:
         loop = asyncio.get_event_loop()
@@ -90,10 +230,15 @@ class MotorDecoratorController:
                     loop.close()
                 else:
                     server_info = loop.run_until_complete(client.server_info())
+                client.close()
                 logger.info(server_info)
         else:
             raise MotorDecoratorClustersNotRegistered("Clusters are not registered")
 
+    @property
+    def name(self) -> str:
+        return f"{self._cluster_name}/{self._database_name.name}"
+
     @property
     def clusters(self) -> dict[str, MotorDecoratorRegisteredCluster]:
         return self._clusters
@@ -110,6 +255,109 @@ class MotorDecoratorController:
     def collection(self) -> AgnosticCollection:
         return self._collection
 
+    @property
+    def current_session(self) -> AgnosticClientSession | None:
+        session = _current_session.get()
+        if session is not None and session.client is self._client:
+            return session
+        return None
+
+    @property
+    def limiters(self) -> dict[str, MotorDecoratorLimiter]:
+        """Concurrency limiters of the cluster and its collections with queue depth and wait time statistic"""
+        prefix = f"{self._cluster_name}/"
+        return {
+            name: limiter for name, limiter in self._limiters.items()
+            if name == self._cluster_name or name.startswith(prefix)
+        }
+
+    @property
+    def circuit_breaker(self) -> MotorDecoratorCircuitBreaker | None:
+        return self._clusters[self._cluster_name].circuit_breaker
+
+    @property
+    def transaction_stats(self) -> MotorDecoratorTransactionStats:
+        return self._transaction_stats.setdefault(self._cluster_name, MotorDecoratorTransactionStats())
+
+    @asynccontextmanager
+    async def session(self, causal_consistency: bool = True, **kwargs) -> AsyncIterator[AgnosticClientSession]:
+        """
+        Start client session which is passed to every 'do_*' call inside the context,
+         calls of other db objects of the same cluster included (they share the client).
+        Nested call reuses already started session of the same client
+        """
+        if (session := self.current_session) is not None:
+            yield session
+            return
+
+        async with await self._client.start_session(causal_consistency=causal_consistency, **kwargs) as session:
+            token = _current_session.set(session)
+            try:
+                yield session
+            finally:
+                _current_session.reset(token)
+
+    @asynccontextmanager
+    async def transaction(
+            self,
+            causal_consistency: bool = True,
+            **transaction_options
+    ) -> AsyncIterator[AgnosticClientSession]:
+        """
+        Run all 'do_*' calls inside the context in one transaction.
+        Errors inside transaction are raised instead of retrying, transaction is aborted on any error.
+        Commit is retried on 'UnknownTransactionCommitResult' error label
+        """
+        async with self.session(causal_consistency) as session:
+            if session.in_transaction:
+                yield session
+                return
+
+            started = time.perf_counter()
+            session.start_transaction(**transaction_options)
+            try:
+                yield session
+                await self._commit_transaction(session)
+            except BaseException:
+                if session.in_transaction:
+                    await session.abort_transaction()
+                self._register_transaction(started, committed=False)
+                raise
+            self._register_transaction(started, committed=True)
+
+    @db_tools.transaction_retry(logger, "TransientTransactionError")
+    async def run_transaction(
+            self,
+            callback: Callable,
+            *args,
+            causal_consistency: bool = True,
+            transaction_options: dict | None = None,
+            **kwargs
+    ) -> Any:
+        """
+        Run coroutine function in transaction.
+        Whole transaction is repeated on 'TransientTransactionError' error label
+        """
+        async with self.transaction(causal_consistency, **(transaction_options or {})):
+            return await callback(*args, **kwargs)
+
+    @db_tools.transaction_retry(logger, "UnknownTransactionCommitResult")
+    async def _commit_transaction(self, session: AgnosticClientSession) -> None:
+        self.transaction_stats.commit_attempts += 1
+        await session.commit_transaction()
+
+    def _register_transaction(self, started: float, committed: bool) -> None:
+        duration = time.perf_counter() - started
+        self.transaction_stats.register(duration, committed)
+        if self.EXTENDED_LOGS and self.logger.isEnabledFor(logging.DEBUG):
+            state = "committed" if committed else "aborted"
+            self.logger.debug("Transaction on '%s' cluster %s in %.4fs", self._cluster_name, state, duration)
+
+    def _with_session(self, kwargs: dict) -> dict:
+        if "session" not in kwargs and (session := self.current_session) is not None:
+            kwargs["session"] = session
+        return kwargs
+
     async def __call__(self, collection: MotorDecoratorCollectionName, check_existence: bool = False) -> None:
         if check_existence:
             await self._check_collection(collection)
@@ -128,52 +376,146 @@ class MotorDecoratorController:
 
     def _init_collection(self, collection: MotorDecoratorCollectionName) -> None:
         self._collection = self._database[collection.name]
-        if self.EXTENDED_LOGS:
-            self.logger.debug(f"The '{collection.name}' collection has been initialized")
+        if self.EXTENDED_LOGS and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("The '%s' collection has been initialized", collection.name)
 
     async def check_indexes(self, *required_indexes: MotorDecoratorIndex) -> None:
         exist_indexes = self._collection.list_indexes()
 
-        indexes_to_create = set(required_indexes)
+        indexes_to_create = list(required_indexes)
         async for exist_index in exist_indexes:
             # {"v": 2, "key": {"srid": 1}, "name": "CREATED_1"}
-            for field, _ in exist_index.to_dict()["key"].items():
-                if field in indexes_to_create:
-                    indexes_to_create.remove(field)
+            exist_keys = list(exist_index.to_dict()["key"].items())
+            indexes_to_create = [index for index in indexes_to_create if index.keys() != exist_keys]
 
         for new_index in indexes_to_create:
             await self._collection.create_index(
-                new_index.name,
+                new_index.keys(),
                 unique=new_index.unique,
                 **new_index.kwargs
             )
             if self.EXTENDED_LOGS:
-                self.logger.info(f"Index '{new_index.name}' created")
+                self.logger.info("Index '%s' created", new_index.name)
+
+        if indexes_to_create:
+            self._advisor.invalidate(self._namespace)
+
+    async def create_time_series(self, time_series: MotorDecoratorTimeSeries) -> None:
+        """Create time-series collection if it doesn't exist and init it as the current collection"""
+        created = await self._execute(self._create_time_series_collection, time_series)
+        if created is None:
+            self.logger.error("Time-series collection '%s' isn't checked, retries are finished", time_series.collection)
+        elif created and self.EXTENDED_LOGS:
+            self.logger.info("Time-series collection '%s' created", time_series.collection)
+        self._init_collection(MotorDecoratorCollectionName(time_series.collection))
+
+    async def _create_time_series_collection(self, time_series: MotorDecoratorTimeSeries) -> bool:
+        cursor = await self._database.list_collections(filter={"name": time_series.collection})
+        async for info in cursor:
+            if info.get("type") != "timeseries":
+                self.logger.warning("Collection '%s' exists and it is not time-series collection", info["name"])
+            return False
+        try:
+            await self._database.create_collection(time_series.collection, **time_series.options())
+        except CollectionInvalid:
+            # Created concurrently by another process
+            return False
+        return True
+
+    @property
+    def _namespace(self) -> tuple[str, str]:
+        return self._cluster_name, self._collection.full_name
+
+    async def refresh_indexes(self) -> None:
+        """Update cached indexes metadata of current collection which is used by index advisor and auto hint"""
+        await self._load_indexes(self._namespace, self._collection)
+
+    async def _load_indexes(self, namespace: tuple[str, str], collection: AgnosticCollection) -> None:
+        indexes = await self._execute(self._unpack_iterable, collection.list_indexes())
+        if indexes is not None:
+            self._advisor.set_indexes(namespace, [index.to_dict() for index in indexes])
+
+    async def index_advisor_report(self) -> list[MotorDecoratorIndexAdvice]:
+        """
+        Query shapes observed on collections of the cluster which have no supporting index,
+         with call frequency, cumulative latency and suggested index
+        """
+        for namespace in self._advisor.namespaces(self._cluster_name):
+            if not self._advisor.has_indexes(namespace):
+                database_name, collection_name = namespace[1].split(".", 1)
+                await self._load_indexes(namespace, self._client[database_name][collection_name])
+        return self._advisor.report(self._cluster_name)
+
+    async def _observe_query(self, function: Callable, condition: dict, *args, **kwargs) -> Any:
+        namespace = self._namespace
+        key, stats = self._advisor.shape(condition, kwargs.get("sort"))
+
+        hinted = False
+        if self.AUTO_HINT and "hint" not in kwargs:
+            if not self._advisor.has_indexes(namespace):
+                await self._load_indexes(namespace, self._collection)
+            if hint := self._advisor.hint(namespace, key, stats):
+                kwargs["hint"] = hint
+                hinted = True
+
+        started = time.perf_counter()
+        try:
+            if not hinted:
+                return await function(self, condition, *args, **kwargs)
+            token = auto_hinted.set(True)
+            try:
+                return await function(self, condition, *args, **kwargs)
+            except (MotorDecoratorBadHintError, OperationFailure) as ex:
+                if isinstance(ex, OperationFailure) and not is_rejected_hint(ex):
+                    raise
+                # Cached index is dropped or hidden, indexes are reloaded by the next hinted query
+                self._advisor.invalidate(namespace)
+                self.logger.warning(
+                    "Hint %s is rejected on '%s', query is repeated without hint", kwargs["hint"], namespace[1]
+                )
+                if isinstance(ex, OperationFailure):
+                    # Transaction can't be continued after error
+                    raise
+            finally:
+                auto_hinted.reset(token)
+            del kwargs["hint"]
+            return await function(self, condition, *args, **kwargs)
+        finally:
+            if self.QUERY_ADVISOR:
+                self._advisor.observe(namespace, key, stats, time.perf_counter() - started)
 
     async def _unpack_iterable(
             self,
             result: AgnosticCursor | AgnosticCommandCursor,
-            view_class: Type[MotorDecoratorAbstractView] | None = None
-    ) -> list[dict] | list[MotorDecoratorAbstractView]:
+            view_class: MotorDecoratorViewClass | None = None
+    ) -> list[dict] | list[MotorDecoratorAbstractView | MotorDecoratorRecordView]:
         records = []
         if result:
             if view_class is not None:
+                from_db = self._view_factory(view_class)
                 async for doc in result:
-                    records.append(self._wrap_entity(view_class, doc))
+                    records.append(from_db(doc))
             else:
                 async for doc in result:
                     records.append(doc)
         return records
 
     @staticmethod
-    def _wrap_entity(view_class: Type[MotorDecoratorAbstractView], entity: dict) -> MotorDecoratorAbstractView:
-        if issubclass(view_class, MotorDecoratorAbstractView):
-            return view_class.from_db(entity)
+    def _view_factory(view_class: MotorDecoratorViewClass) -> Callable[[dict], Any]:
+        if issubclass(view_class, (MotorDecoratorAbstractView, MotorDecoratorRecordView)):
+            return view_class.from_db
         raise MotorDecoratorViewError(
-            f"View class ({view_class}) is not a subclass of MotorDecoratorAbstractView."
+            f"View class ({view_class}) is not a subclass of MotorDecoratorAbstractView or MotorDecoratorRecordView."
             f" MRO: {view_class.mro()}"
         )
 
+    @staticmethod
+    def _wrap_entity(
+            view_class: MotorDecoratorViewClass,
+            entity: dict
+    ) -> MotorDecoratorAbstractView | MotorDecoratorRecordView:
+        return MotorDecoratorController._view_factory(view_class)(entity)
+
     async def do_insert_one(
             self,
             document: dict,
@@ -188,7 +530,7 @@ class MotorDecoratorController:
             retry_param=MotorDecoratorRetryParameters(
                 skip_duplicate_key_error_info=duplicate_skip
             ),
-            **kwargs
+            **self._with_session(kwargs)
         )
 
         if response is None:
@@ -216,7 +558,7 @@ class MotorDecoratorController:
             retry_param=MotorDecoratorRetryParameters(
                 skip_duplicate_key_error_info=duplicate_skip
             ),
-            **kwargs
+            **self._with_session(kwargs)
         )
         if response is None:
             return False
@@ -227,6 +569,7 @@ class MotorDecoratorController:
             return response
         return response.acknowledged
 
+    @observe_query
     async def do_update_one(
             self,
             condition: dict,
@@ -245,7 +588,7 @@ class MotorDecoratorController:
             retry_param=MotorDecoratorRetryParameters(
                 skip_duplicate_key_error_info=duplicate_skip
             ),
-            **kwargs
+            **self._with_session(kwargs)
         )
         if response is None:
             return 0
@@ -256,6 +599,7 @@ class MotorDecoratorController:
             return response
         return response.modified_count
 
+    @observe_query
     async def do_update_many(
             self,
             condition: dict,
@@ -272,7 +616,7 @@ class MotorDecoratorController:
             retry_param=MotorDecoratorRetryParameters(
                 skip_duplicate_key_error_info=duplicate_skip
             ),
-            **kwargs)
+            **self._with_session(kwargs))
         if response is None:
             return 0
 
@@ -282,44 +626,47 @@ class MotorDecoratorController:
             return response
         return response.modified_count
 
+    @observe_query
     async def do_find_one(
             self,
             condition: dict,
             projection: dict | None = None,
-            view_class: Type[MotorDecoratorAbstractView] | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
             **kwargs
-    ) -> dict | None | MotorDecoratorAbstractView:
+    ) -> dict | None | MotorDecoratorAbstractView | MotorDecoratorRecordView:
         record = await self._execute(
             function=self._collection.find_one,
             filter=condition,
             projection=projection,
-            **kwargs)
+            **self._with_session(kwargs))
         if view_class and record:
             return self._wrap_entity(view_class, record)
         return record
 
+    @observe_query
     async def do_find_many(
             self,
             condition: dict,
             projection: dict | None = None,
-            view_class: Type[MotorDecoratorAbstractView] | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
             **kwargs
-    ) -> list[dict] | list[MotorDecoratorAbstractView]:
-        cursor = self._collection.find(filter=condition, projection=projection, **kwargs)
+    ) -> list[dict] | list[MotorDecoratorAbstractView | MotorDecoratorRecordView]:
+        cursor = self._collection.find(filter=condition, projection=projection, **self._with_session(kwargs))
         records = await self._execute(self._unpack_iterable, cursor, view_class)
         return records
 
+    @observe_query
     async def do_find_one_and_update(
             self,
             condition: dict,
             updating_fields: dict,
             upsert: bool = False,
             projection: dict | None = None,
-            view_class: Type[MotorDecoratorAbstractView] | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
             return_before: bool = True,
             duplicate_skip: bool = False,
             **kwargs,
-    ) -> dict | MotorDecoratorAbstractView | None:
+    ) -> dict | MotorDecoratorAbstractView | MotorDecoratorRecordView | None:
         if return_before is True:
             return_document = ReturnDocument.BEFORE
         else:
@@ -338,17 +685,18 @@ class MotorDecoratorController:
             retry_param=MotorDecoratorRetryParameters(
                 skip_duplicate_key_error_info=duplicate_skip
             ),
-            **kwargs
+            **self._with_session(kwargs)
         )
         if view_class and response:
             return self._wrap_entity(view_class, response)
         return response
 
+    @observe_query
     async def do_delete_one(self, condition: dict, raw_response: bool = False, **kwargs) -> int | DeleteResult:
         response = await self._execute(
             function=self._collection.delete_one,
             filter=condition,
-            **kwargs
+            **self._with_session(kwargs)
         )
         if response is None:
             return 0
@@ -357,11 +705,12 @@ class MotorDecoratorController:
             return response
         return response.deleted_count
 
+    @observe_query
     async def do_delete_many(self, condition: dict, raw_response: bool = False, **kwargs) -> int | DeleteResult:
         response = await self._execute(
             function=self._collection.delete_many,
             filter=condition,
-            **kwargs
+            **self._with_session(kwargs)
         )
         if response is None:
             return 0
@@ -373,10 +722,10 @@ class MotorDecoratorController:
     async def do_aggregate(
             self,
             pipeline: list[dict],
-            view_class: Type[MotorDecoratorAbstractView] | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
             **kwargs
-    ) -> list[dict] | list[MotorDecoratorAbstractView]:
-        cursor = self._collection.aggregate(pipeline, **kwargs)
+    ) -> list[dict] | list[MotorDecoratorAbstractView | MotorDecoratorRecordView]:
+        cursor = self._collection.aggregate(pipeline, **self._with_session(kwargs))
         records = await self._execute(self._unpack_iterable, cursor, view_class)
         return records
 
@@ -396,7 +745,7 @@ class MotorDecoratorController:
             retry_param=MotorDecoratorRetryParameters(
                 skip_duplicate_key_error_info=duplicate_skip
             ),
-            **kwargs
+            **self._with_session(kwargs)
         )
         if response is None:
             return False
@@ -408,15 +757,269 @@ class MotorDecoratorController:
 
         return response.acknowledged
 
+    async def sync_documents(
+            self,
+            records: Iterable[dict | MotorDecoratorAbstractView | MotorDecoratorRecordView],
+            key_fields: Sequence[str],
+            view_class: MotorDecoratorViewClass | None = None,
+            snapshot: Iterable[dict] | None = None,
+            ordered: bool = False,
+            batch_size: int = 1_000,
+            merge_threshold: int | None = None,
+            staging_collection: str | None = None,
+            **kwargs
+    ) -> MotorDecoratorSyncResult:
+        """
+        Upsert records by key fields. Only fields of 'view_class' projection are written when it is set.
+        With 'snapshot' (prefetched documents) unchanged records are skipped and only changed fields are set,
+         without it server compares documents and unchanged records are counted by matched but not modified.
+        From 'merge_threshold' records documents are inserted to new staging collection and merged by '$merge'
+         stage, it requires unique index on key fields and ignores 'ordered'.
+        Key field 'id' of the view is '_id' of the document, every record must contain all key fields
+        """
+        key_fields = ["_id" if field == "id" else field for field in key_fields]
+        fields = self._sync_fields(view_class)
+        documents = [self._to_document(record, fields) for record in records]
+        for document in documents:
+            if missing := [field for field in key_fields if field not in document]:
+                # Filter {field: None} matches every document without the field
+                raise MotorDecoratorValueError(f"Record has no key fields {missing}: {document}")
+
+        result = MotorDecoratorSyncResult()
+        if merge_threshold is not None and len(documents) >= merge_threshold:
+            await self._merge_documents(documents, key_fields, staging_collection, batch_size, result, **kwargs)
+            return result
+
+        existing = None
+        if snapshot is not None:
+            existing = {self._sync_key(document, key_fields): document for document in snapshot}
+
+        operations = []
+        for document in documents:
+            operation = self._sync_operation(document, key_fields, existing)
+            if operation is None:
+                result.unchanged += 1
+            else:
+                operations.append(operation)
+
+        for start in range(0, len(operations), batch_size):
+            batch = operations[start:start + batch_size]
+            response = await self._execute(
+                function=self._collection.bulk_write,
+                requests=batch,
+                ordered=ordered,
+                **self._with_session(dict(kwargs))
+            )
+            result.writes += 1
+            if response is None:
+                result.failed += len(batch)
+                continue
+            result.inserted += response.upserted_count
+            result.updated += response.modified_count
+            result.unchanged += response.matched_count - response.modified_count
+
+        if self.EXTENDED_LOGS and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Documents of '%s' are synchronized: %s", self._collection.full_name, result)
+        return result
+
+    @staticmethod
+    def _sync_fields(view_class: MotorDecoratorViewClass | None) -> set[str] | None:
+        if view_class is None:
+            return None
+        return {field for field, flag in view_class.projection().items() if flag}
+
+    @staticmethod
+    def _to_document(
+            record: dict | MotorDecoratorAbstractView | MotorDecoratorRecordView,
+            fields: set[str] | None
+    ) -> dict:
+        if isinstance(record, MotorDecoratorAbstractView):
+            record = record.model_dump()
+        elif isinstance(record, MotorDecoratorRecordView):
+            record = record.to_dict()
+        elif not isinstance(record, dict):
+            raise MotorDecoratorViewError(f"Record ({type(record)}) is not a dict or view")
+
+        if "id" in record and "_id" not in record:
+            record = dict(record)
+            record["_id"] = record.pop("id")
+        if fields is None:
+            return record
+        return {field: value for field, value in record.items() if field in fields}
+
+    @staticmethod
+    def _sync_key(document: dict, key_fields: Sequence[str]) -> tuple:
+        return tuple(document.get(field) for field in key_fields)
+
+    def _sync_operation(
+            self,
+            document: dict,
+            key_fields: Sequence[str],
+            existing: dict[tuple, dict] | None
+    ) -> UpdateOne | None:
+        condition = {field: document.get(field) for field in key_fields}
+        changed = {field: value for field, value in document.items() if field not in condition and field != "_id"}
+        update: dict[str, dict] = dict()
+
+        if existing is not None and (current := existing.get(self._sync_key(document, key_fields))) is not None:
+            changed = {field: value for field, value in changed.items() if current.get(field, _MISSING) != value}
+            if not changed:
+                return None
+        elif "_id" in document and "_id" not in condition:
+            # '_id' can't be changed for existing document, it is only set for inserted one
+            update["$setOnInsert"] = {"_id": document["_id"]}
+
+        if changed:
+            update["$set"] = changed
+        elif not update:
+            update["$setOnInsert"] = condition
+        return UpdateOne(condition, update, upsert=True)
+
+    async def _merge_documents(
+            self,
+            documents: list[dict],
+            key_fields: Sequence[str],
+            staging_collection: str | None,
+            batch_size: int,
+            result: MotorDecoratorSyncResult,
+            **kwargs
+    ) -> None:
+        target = self._collection
+        if staging_collection is not None:
+            exist_collections = await self._execute(
+                self._database.list_collection_names, filter={"name": staging_collection}
+            )
+            if exist_collections is None:
+                result.failed = len(documents)
+                return
+            if exist_collections:
+                # Documents of existing collection would be merged into target and the collection dropped
+                raise MotorDecoratorValueError(f"Staging collection '{staging_collection}' already exists")
+        staging = self._database[staging_collection or f"{target.name}_sync_{ObjectId()}"]
+        pipeline: list[dict] = []
+        if "_id" not in key_fields:
+            # '_id' of staging document differs from '_id' of matched target document
+            pipeline.append({"$project": {"_id": 0}})
+        pipeline.append({
+            "$merge": {"into": target.name, "on": list(key_fields), "whenMatched": "merge", "whenNotMatched": "insert"}
+        })
+
+        try:
+            for start in range(0, len(documents), batch_size):
+                # Copies, because driver adds '_id' to inserted documents
+                batch = [dict(document) for document in documents[start:start + batch_size]]
+                response = await self._execute(
+                    function=staging.insert_many, documents=batch, ordered=False, **self._with_session(dict(kwargs))
+                )
+                result.writes += 1
+                if response is None:
+                    result.failed = len(documents)
+                    return
+
+            response = await self._execute(self._run_pipeline, staging, pipeline, **self._with_session(dict(kwargs)))
+            result.writes += 1
+            if response is None:
+                result.failed = len(documents)
+            else:
+                result.merged = len(documents)
+        finally:
+            await self._execute(staging.drop)
+
+    async def _run_pipeline(self, collection: AgnosticCollection, pipeline: list[dict], **kwargs) -> list[dict]:
+        # Cursor is created by every attempt, retry of the failed cursor returns nothing and looks like success
+        return await self._unpack_iterable(collection.aggregate(pipeline, **kwargs))
+
+    @observe_query
     async def get_document_count(self, condition: dict, **kwargs) -> int:
         response = await self._execute(
             function=self._collection.count_documents,
             filter=condition,
-            **kwargs
+            **self._with_session(kwargs)
         )
         return 0 if response is None else response
 
-    @db_tools.retry(logger)
+    async def do_query(self, query: MotorDecoratorQuery, /, **values) -> Any:
+        """Bind values to prepared query and execute it by corresponding 'do_*' method"""
+        bound = query.bind(**values)
+        if query.collection is not None:
+            self._init_collection(query.collection)
+
+        operation = query.operation
+        if operation == "find_many":
+            return await self.do_find_many(bound.condition, view_class=query.view_class, **query.kwargs)
+        elif operation == "find_one":
+            return await self.do_find_one(bound.condition, view_class=query.view_class, **query.kwargs)
+        elif operation == "find_one_and_update":
+            return await self.do_find_one_and_update(
+                bound.condition, bound.update, view_class=query.view_class, **query.kwargs
+            )
+        elif operation == "update_one":
+            return await self.do_update_one(bound.condition, bound.update, **query.kwargs)
+        elif operation == "update_many":
+            return await self.do_update_many(bound.condition, bound.update, **query.kwargs)
+        elif operation == "delete_one":
+            return await self.do_delete_one(bound.condition, **query.kwargs)
+        elif operation == "delete_many":
+            return await self.do_delete_many(bound.condition, **query.kwargs)
+        elif operation == "count":
+            return await self.get_document_count(bound.condition, **query.kwargs)
+        return await self.do_aggregate(bound.condition, view_class=query.view_class, **query.kwargs)
+
     async def _execute(self, function: Callable, *args, **kwargs) -> Any:
-        results = await function(*args, **kwargs)
+        circuit_breaker = self.circuit_breaker
+        session = self.current_session
+        if session is not None and session.in_transaction:
+            # Transaction can't be continued after error, so error goes to transaction context
+            kwargs.pop("retry_param", None)
+            if circuit_breaker is None:
+                return await call_within_deadline(self._execute_limited, function, *args, **kwargs)
+            with circuit_breaker.guard():
+                return await call_within_deadline(self._execute_limited, function, *args, **kwargs)
+        return await self._execute_with_retry(function, *args, circuit_breaker=circuit_breaker, **kwargs)
+
+    @db_tools.retry(logger)
+    async def _execute_with_retry(self, function: Callable, *args, **kwargs) -> Any:
+        results = await self._execute_limited(function, *args, **kwargs)
         return results
+
+    async def _execute_limited(self, function: Callable, *args, **kwargs) -> Any:
+        cluster = self._clusters[self._cluster_name]
+        if cluster.concurrency.max_concurrency is None and cluster.concurrency.collection_concurrency is None:
+            return await function(*args, **kwargs)
+
+        async with AsyncExitStack() as stack:
+            # Collection slot first, so cluster slot is not held while waiting for hot collection
+            if cluster.concurrency.collection_concurrency is not None and self._collection_name is not None:
+                await stack.enter_async_context(self._get_limiter(cluster, self._collection_name)())
+            if cluster.concurrency.max_concurrency is not None:
+                await stack.enter_async_context(self._get_limiter(cluster)())
+            return await function(*args, **kwargs)
+
+    def _get_limiter(
+            self,
+            cluster: MotorDecoratorRegisteredCluster,
+            collection_name: str | None = None
+    ) -> MotorDecoratorLimiter:
+        if collection_name is None:
+            name, limit = cluster.name, cluster.concurrency.max_concurrency
+        else:
+            name, limit = f"{cluster.name}/{collection_name}", cluster.concurrency.collection_concurrency
+
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = MotorDecoratorLimiter(name, limit, cluster.concurrency.max_queue)
+            self._limiters[name] = limiter
+        return limiter
+
+
+def _after_fork_in_child() -> None:
+    # Sockets, locks and event loop futures of the parent process must not be used in the child
+    global _fork_generation
+    _fork_generation += 1
+    MotorDecoratorController._limiters.clear()
+    MotorDecoratorController._shared_clients.clear()
+    db_tools.restart_queue_logging()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+import pymongo
+
+from .exception import MotorDecoratorDeadlineExceededError
+
+__all__ = ["call_deadline", "remaining_time", "check_deadline", "call_within_deadline"]
+
+# Absolute time.monotonic() moment when database calls of the current task must be finished
+_current_deadline: ContextVar[float | None] = ContextVar("motor_decorator_deadline", default=None)
+
+
+@contextmanager
+def call_deadline(seconds: float) -> Iterator[None]:
+    """
+    Set time budget of database calls inside the context. Nested context can't extend deadline of outer one,
+     so nested calls stay within budget of the whole request
+    """
+    deadline = time.monotonic() + seconds
+    outer = _current_deadline.get()
+    token = _current_deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """Seconds left to deadline of the current context, None if deadline is not set"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(function: Callable) -> None:
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise MotorDecoratorDeadlineExceededError(f"Deadline exceeded before call of <{function.__name__}>")
+
+
+async def call_within_deadline(function: Callable, *args, **kwargs) -> Any:
+    """
+    Call is limited by remaining time: driver adds it as 'maxTimeMS' to every command of the call
+     (cursor batches included) and asyncio timeout covers waiting in the queue and on the network.
+    Server and driver timeouts are raised as is, circuit breaker counts them only when the budget wasn't shorter
+     than response timeout of the cluster
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return await function(*args, **kwargs)
+    if remaining <= 0:
+        raise MotorDecoratorDeadlineExceededError(f"Deadline exceeded before call of <{function.__name__}>")
+
+    try:
+        with pymongo.timeout(remaining):
+            async with asyncio.timeout(remaining):
+                return await function(*args, **kwargs)
+    except TimeoutError as ex:
+        if isinstance(ex, MotorDecoratorDeadlineExceededError):
+            raise
+        raise MotorDecoratorDeadlineExceededError(
+            f"Deadline exceeded in {remaining:.3f}s during call of <{function.__name__}>"
+        ) from ex
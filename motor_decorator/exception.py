@@ -10,9 +10,29 @@ class MotorDecoratorViewError(Exception):
     """If received wrong type of subclass of AbstractView"""
 
 
+class MotorDecoratorQueryError(Exception):
+    """If prepared query template is invalid or bound with wrong params"""
+
+
+class MotorDecoratorBadHintError(Exception):
+    """If server rejected index hint added by index advisor (index is dropped or hidden)"""
+
+
+class MotorDecoratorQueueOverflowError(Exception):
+    """If concurrency limiter queue of the cluster exceeds the limit"""
+
+
+class MotorDecoratorCircuitOpenError(Exception):
+    """If circuit breaker of the cluster is open and calls fail fast"""
+
+
 class MotorDecoratorValueError(ValueError):
     ...
 
 
 class MotorDecoratorTypeError(TypeError):
     ...
+
+
+class MotorDecoratorDeadlineExceededError(TimeoutError):
+    """If deadline of database calls is exceeded on the client side, circuit breaker doesn't count it"""
@@ -0,0 +1,309 @@
+import asyncio
+import datetime
+import heapq
+import logging
+import re
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, AsyncIterator, Awaitable, Callable, TYPE_CHECKING
+
+from bson import Binary, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp
+
+from .abstract_view import MotorDecoratorAbstractView, MotorDecoratorRecordView, MotorDecoratorViewClass
+from .controller import MotorDecoratorController, logger
+from .objects import MotorDecoratorCollectionName, MotorDecoratorFanOutResult
+from .tools import db_tools
+
+if TYPE_CHECKING:
+    from .base_db import MotorDecoratorBaseDB
+
+__all__ = ["MotorDecoratorFanOut", ]
+
+_Query = Callable[[MotorDecoratorController], Awaitable[Any]]
+
+# Comparison order of BSON types in Mongo sort, values of different types are compared by the type rank
+_TYPE_RANKS: dict[type, int] = {
+    MinKey: 0,
+    type(None): 1,
+    int: 2,
+    Int64: 2,
+    float: 2,
+    Decimal: 2,
+    str: 3,
+    dict: 4,
+    list: 5,
+    tuple: 5,
+    bytes: 6,
+    Binary: 6,
+    uuid.UUID: 6,
+    ObjectId: 7,
+    bool: 8,
+    datetime.datetime: 9,
+    Timestamp: 10,
+    Regex: 11,
+    re.Pattern: 11,
+    MaxKey: 12,
+}
+_UNKNOWN_RANK = 13
+
+
+def _bson_key(value: Any) -> tuple:
+    """Orderable key of any value: values of one BSON type are compared by value, other types by type rank"""
+    value_type = type(value)
+    rank = _TYPE_RANKS.get(value_type)
+    if rank is None:
+        if isinstance(value, Decimal128):
+            return 2, value.to_decimal()
+        rank = next((rank for known, rank in _TYPE_RANKS.items() if isinstance(value, known)), _UNKNOWN_RANK)
+        if rank == _UNKNOWN_RANK:
+            return rank, value_type.__name__, repr(value)
+    if rank in (0, 1, 12):
+        return rank,
+    if rank == 4:
+        return rank, tuple((key, _bson_key(item)) for key, item in value.items())
+    if rank == 5:
+        return rank, tuple(_bson_key(item) for item in value)
+    if rank == 6:
+        return rank, bytes(value.bytes if isinstance(value, uuid.UUID) else value)
+    if rank == 11:
+        return rank, str(value.pattern), value.flags
+    return rank, value
+
+
+class _SortKey:
+    """
+    Compares values of sort fields with own direction of every field.
+    Values of different types are compared in BSON order like in Mongo, None is less than any value
+    """
+    __slots__ = ("values", "directions")
+
+    def __init__(self, values: tuple, directions: tuple[int, ...]) -> None:
+        self.values = values
+        self.directions = directions
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        for value, other_value, direction in zip(self.values, other.values, self.directions):
+            if value == other_value:
+                continue
+            less = value < other_value
+            return less if direction > 0 else not less
+        return False
+
+
+def _field_value(record: dict | MotorDecoratorAbstractView | MotorDecoratorRecordView, field: str) -> Any:
+    if isinstance(record, dict):
+        value: Any = record
+        for part in field.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return getattr(record, field, None)
+
+
+class MotorDecoratorFanOut:
+    """
+    Runs the same query concurrently on several db objects (registered clusters and databases)
+     and merges results, so reading takes as long as the slowest target.
+    Query of every target is limited by 'timeout' seconds. Failed and timed out targets
+     are reported in the result, records of other targets are returned
+    """
+
+    def __init__(
+            self,
+            *targets: "MotorDecoratorBaseDB | MotorDecoratorController",
+            collection: str | None = None,
+            timeout: float | None = None
+    ) -> None:
+        self.controllers: list[MotorDecoratorController] = [
+            target if isinstance(target, MotorDecoratorController) else target.controller for target in targets
+        ]
+        self.collection = collection
+        self.timeout = timeout
+
+    async def find_many(
+            self,
+            condition: dict,
+            projection: dict | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
+            sort: list[tuple[str, int]] | None = None,
+            key: Callable[[Any], Any] | None = None,
+            limit: int = 0,
+            **kwargs
+    ) -> MotorDecoratorFanOutResult:
+        result = MotorDecoratorFanOutResult()
+        stream = self.stream_find_many(condition, projection, view_class, sort, key, limit, result=result, **kwargs)
+        result.records = [record async for record in stream]
+        return result
+
+    async def aggregate(
+            self,
+            pipeline: list[dict],
+            view_class: MotorDecoratorViewClass | None = None,
+            sort: list[tuple[str, int]] | None = None,
+            key: Callable[[Any], Any] | None = None,
+            limit: int = 0,
+            **kwargs
+    ) -> MotorDecoratorFanOutResult:
+        result = MotorDecoratorFanOutResult()
+        stream = self.stream_aggregate(pipeline, view_class, sort, key, limit, result=result, **kwargs)
+        result.records = [record async for record in stream]
+        return result
+
+    async def count(self, condition: dict, **kwargs) -> MotorDecoratorFanOutResult:
+        result = MotorDecoratorFanOutResult()
+
+        async def query(controller: MotorDecoratorController) -> int | None:
+            # Not 'get_document_count', it answers 0 when retries are finished
+            return await controller._execute(
+                function=controller.collection.count_documents,
+                filter=condition,
+                **controller._with_session(dict(kwargs))
+            )
+
+        responses = await asyncio.gather(*(self._run(controller, query, result) for controller in self.controllers))
+        for controller, response in zip(self.controllers, responses):
+            if response is not None:
+                result.counts[controller.name] = response
+        return result
+
+    def stream_find_many(
+            self,
+            condition: dict,
+            projection: dict | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
+            sort: list[tuple[str, int]] | None = None,
+            key: Callable[[Any], Any] | None = None,
+            limit: int = 0,
+            result: MotorDecoratorFanOutResult | None = None,
+            **kwargs
+    ) -> AsyncIterator[dict | MotorDecoratorAbstractView | MotorDecoratorRecordView]:
+        """
+        Unsorted records are yielded as soon as the target answers.
+        With 'sort' every target returns sorted records which are merged by the sort fields,
+         'key' extracts values of sort fields from the record when view field names differ
+        """
+        if sort is not None:
+            kwargs["sort"] = sort
+        if limit:
+            kwargs["limit"] = limit
+
+        async def query(controller: MotorDecoratorController) -> list | None:
+            return await controller.do_find_many(condition, projection, view_class, **kwargs)
+
+        return self._stream(query, sort, key, limit, result)
+
+    def stream_aggregate(
+            self,
+            pipeline: list[dict],
+            view_class: MotorDecoratorViewClass | None = None,
+            sort: list[tuple[str, int]] | None = None,
+            key: Callable[[Any], Any] | None = None,
+            limit: int = 0,
+            result: MotorDecoratorFanOutResult | None = None,
+            **kwargs
+    ) -> AsyncIterator[dict | MotorDecoratorAbstractView | MotorDecoratorRecordView]:
+        """Same as 'stream_find_many', '$sort' and '$limit' stages are added to the pipeline of every target"""
+        pipeline = list(pipeline)
+        if sort is not None and (not pipeline or pipeline[-1] != {"$sort": dict(sort)}):
+            pipeline.append({"$sort": dict(sort)})
+        if limit:
+            pipeline.append({"$limit": limit})
+
+        async def query(controller: MotorDecoratorController) -> list | None:
+            return await controller.do_aggregate(pipeline, view_class, **kwargs)
+
+        return self._stream(query, sort, key, limit, result)
+
+    async def _stream(
+            self,
+            query: _Query,
+            sort: list[tuple[str, int]] | None,
+            key: Callable[[Any], Any] | None,
+            limit: int,
+            result: MotorDecoratorFanOutResult | None
+    ) -> AsyncIterator[dict | MotorDecoratorAbstractView | MotorDecoratorRecordView]:
+        result = result if result is not None else MotorDecoratorFanOutResult()
+        tasks = [asyncio.create_task(self._run(controller, query, result)) for controller in self.controllers]
+        try:
+            if sort is None:
+                records = self._as_completed(tasks)
+            else:
+                responses = await asyncio.gather(*tasks)
+                merged = heapq.merge(*(response for response in responses if response), key=_sort_key(sort, key))
+                records = _aiter(merged)
+
+            count = 0
+            async for record in records:
+                yield record
+                count += 1
+                if count == limit:
+                    break
+        finally:
+            # Consumer may stop iteration before all targets answered
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _as_completed(tasks: list[asyncio.Task]) -> AsyncIterator[Any]:
+        for next_response in asyncio.as_completed(tasks):
+            for record in await next_response or ():
+                yield record
+
+    async def _run(
+            self,
+            controller: MotorDecoratorController,
+            query: _Query,
+            result: MotorDecoratorFanOutResult
+    ) -> Any:
+        name = controller.name
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                if self.collection is not None:
+                    await controller(MotorDecoratorCollectionName(self.collection))
+                response = await query(controller)
+        except TimeoutError:
+            result.timed_out.append(name)
+            db_tools.log_throttled(
+                logger, logging.WARNING, "Fan-out query to '%s' timed out after %ss", name, self.timeout,
+                key=("fan-out", name, "timeout")
+            )
+            return None
+        except Exception as error:
+            result.failed[name] = repr(error)
+            db_tools.log_throttled(
+                logger, logging.WARNING, "Fan-out query to '%s' failed: %r", name, error,
+                key=("fan-out", name, error.__class__)
+            )
+            return None
+        finally:
+            result.durations[name] = time.perf_counter() - started
+
+        if response is None:
+            result.failed[name] = "No response: retries are finished or cluster is unavailable"
+            return None
+        result.succeeded.append(name)
+        return response
+
+
+def _sort_key(sort: list[tuple[str, int]], key: Callable[[Any], Any] | None) -> Callable[[Any], _SortKey]:
+    directions = tuple(direction for _, direction in sort)
+    fields = [field for field, _ in sort]
+
+    def extract(record: Any) -> _SortKey:
+        if key is None:
+            values = tuple(_field_value(record, field) for field in fields)
+        else:
+            values = key(record)
+            if not isinstance(values, tuple):
+                values = (values,)
+        return _SortKey(tuple(_bson_key(value) for value in values), directions)
+
+    return extract
+
+
+async def _aiter(records: Any) -> AsyncIterator[Any]:
+    for record in records:
+        yield record
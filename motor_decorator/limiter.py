@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator
+
+from .exception import MotorDecoratorQueueOverflowError
+from .objects import MotorDecoratorPriority, MotorDecoratorLimiterStats
+
+__all__ = ["MotorDecoratorLimiter", "call_priority"]
+
+_current_priority: ContextVar[int] = ContextVar("motor_decorator_priority", default=MotorDecoratorPriority.DEFAULT)
+
+
+@contextmanager
+def call_priority(priority: MotorDecoratorPriority | int) -> Iterator[None]:
+    """Set priority of database calls inside the context for concurrency limiters queue"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class MotorDecoratorLimiter:
+    """
+    Async semaphore with priority queue. Released slot is handed over to the waiter with the lowest priority value,
+     waiters with equal priority are served in arrival order.
+    If 'max_queue' is set, call fails fast with MotorDecoratorQueueOverflowError when queue is full
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int | None = None) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.stats = MotorDecoratorLimiterStats()
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.name}, active={self._active}/{self.limit},"
+            f" queue={self.queue_depth})"
+        )
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[None]:
+        await self.acquire(_current_priority.get())
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = MotorDecoratorPriority.DEFAULT) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            self.stats.register_wait(0.0)
+            return
+
+        if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+            self.stats.rejected += 1
+            raise MotorDecoratorQueueOverflowError(
+                f"Concurrency limiter '{self.name}' queue is full ({len(self._waiters)} waiters)"
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (priority, next(self._counter), future)
+        heapq.heappush(self._waiters, waiter)
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._waiters))
+
+        started = time.perf_counter()
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Slot was handed over before cancellation
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            raise
+        self.stats.register_wait(time.perf_counter() - started)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
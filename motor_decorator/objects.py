@@ -1,7 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import TYPE_CHECKING
 
 from .exception import MotorDecoratorValueError, MotorDecoratorTypeError
 
+if TYPE_CHECKING:
+    from .breaker import MotorDecoratorCircuitBreaker
+
 
 class MotorDecoratorNameObject:
     def __init__(self, name: str) -> None:
@@ -49,11 +54,44 @@ class MotorDecoratorIndex:
     def __eq__(self, other: str) -> bool:
         if isinstance(other, str):
             return self.name == other
-        return self == other
+        elif isinstance(other, MotorDecoratorIndex):
+            return self.name == other.name
+        return False
 
     def __hash__(self) -> int:
         return hash(self.name)
 
+    def keys(self) -> list[tuple[str, int | str]]:
+        """Index keys as list of (field, direction) pairs, accepted by 'hint' and 'sort' arguments"""
+        return [(key, 1) if isinstance(key, str) else tuple(key) for key in self.name]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(map(repr, self.name))}, unique={self.unique})"
+
+
+class MotorDecoratorTTLIndex(MotorDecoratorIndex):
+    """Index which removes documents 'expire_after_seconds' after datetime value of the field"""
+
+    def __init__(self, field: str, expire_after_seconds: int, **kwargs) -> None:
+        if not isinstance(expire_after_seconds, int) or expire_after_seconds < 0:
+            raise MotorDecoratorValueError("expire_after_seconds must be non-negative int!")
+        super().__init__(field, expireAfterSeconds=expire_after_seconds, **kwargs)
+        self.expire_after_seconds = expire_after_seconds
+
+
+class MotorDecoratorQueryParam:
+    """Placeholder for value in prepared query template, which is bound on query call"""
+
+    def __init__(self, name: str) -> None:
+        if not isinstance(name, str):
+            raise MotorDecoratorTypeError(f"Query param name must be a string, not a {type(name)}!")
+        elif not name:
+            raise MotorDecoratorValueError(f"Query param name must be non-empty string!")
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name})"
+
 
 class MotorDecoratorClusterUrl:
     url_template = "mongodb://{username}:{password}@{host}:{port}/"
@@ -95,17 +133,41 @@ class MotorDecoratorClusterUrl:
         return f"{self.__class__.__name__}({', '.join(attributes_string)})"
 
 
+@dataclass
+class MotorDecoratorConcurrencyParameters:
+    """DTO to configure concurrency limits of the cluster"""
+    max_concurrency: int | None = None
+    max_queue: int | None = None
+    collection_concurrency: int | None = None
+
+    def __post_init__(self) -> None:
+        for name in ("max_concurrency", "max_queue", "collection_concurrency"):
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if not isinstance(value, int):
+                raise MotorDecoratorTypeError(f"{name} type must be int, not a '{type(value)}'!")
+            elif value < 0 or (value == 0 and name != "max_queue"):
+                raise MotorDecoratorValueError(f"{name} must be positive int!")
+
+
 class MotorDecoratorRegisteredCluster:
     def __init__(
             self,
             cluster_name: MotorDecoratorClusterName,
             cluster_url: MotorDecoratorClusterUrl,
             response_timeout: int,
+            concurrency: MotorDecoratorConcurrencyParameters | None = None,
+            circuit_breaker: "MotorDecoratorBreakerParameters | None" = None,
             **kwargs
     ) -> None:
         self.name = cluster_name.name
         self.url = cluster_url.url
         self.timeout = response_timeout
+        self.concurrency = concurrency or MotorDecoratorConcurrencyParameters()
+        self.breaker_parameters = circuit_breaker
+        # Created by controller on cluster registration
+        self.circuit_breaker: "MotorDecoratorCircuitBreaker | None" = None
         self.kwargs = kwargs
 
     def __repr__(self) -> str:
@@ -117,3 +179,183 @@ class MotorDecoratorRegisteredCluster:
 class MotorDecoratorRetryParameters:
     """DTO to configure retry decorator for db tools class"""
     skip_duplicate_key_error_info: bool = False
+
+
+@dataclass
+class MotorDecoratorTransactionStats:
+    """DTO to collect transactions statistic of the cluster"""
+    committed: int = 0
+    aborted: int = 0
+    commit_attempts: int = 0
+    total_duration: float = 0.0
+    last_duration: float = 0.0
+
+    def register(self, duration: float, committed: bool) -> None:
+        if committed:
+            self.committed += 1
+        else:
+            self.aborted += 1
+        self.total_duration += duration
+        self.last_duration = duration
+
+
+@dataclass
+class MotorDecoratorQueryShapeStats:
+    """DTO to collect statistic of the query shape observed on collection"""
+    equality: tuple[str, ...]
+    sort: tuple[tuple[str, int], ...]
+    range: tuple[str, ...]
+    calls: int = 0
+    total_latency: float = 0.0
+
+    def observe(self, latency: float) -> None:
+        self.calls += 1
+        self.total_latency += latency
+
+
+@dataclass
+class MotorDecoratorIndexAdvice:
+    """DTO of index advisor report for query shape without supporting index"""
+    cluster: str
+    namespace: str
+    shape: str
+    calls: int
+    total_latency: float
+    suggested_index: MotorDecoratorIndex
+    exist_indexes: list[list[tuple[str, int | str]]] = field(default_factory=list)
+
+
+class MotorDecoratorPriority(IntEnum):
+    """Priority of database calls waiting for concurrency limiter slot, lower value is served first"""
+    INTERACTIVE = 0
+    DEFAULT = 5
+    BATCH = 10
+
+
+@dataclass
+class MotorDecoratorLimiterStats:
+    """DTO to collect statistic of concurrency limiter"""
+    acquired: int = 0
+    rejected: int = 0
+    waited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    max_queue_depth: int = 0
+
+    def register_wait(self, wait: float) -> None:
+        self.acquired += 1
+        if wait:
+            self.waited += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+class MotorDecoratorBreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+@dataclass
+class MotorDecoratorBreakerParameters:
+    """DTO to configure circuit breaker of the cluster"""
+    failure_threshold: int = 5
+    error_rate_threshold: float = 0.5
+    window_size: int = 20
+    min_calls: int = 10
+    recovery_timeout: float = 30.0
+    half_open_probes: int = 1
+
+    def __post_init__(self) -> None:
+        for name in ("failure_threshold", "window_size", "min_calls", "half_open_probes"):
+            value = getattr(self, name)
+            if not isinstance(value, int):
+                raise MotorDecoratorTypeError(f"{name} type must be int, not a '{type(value)}'!")
+            elif value < 1:
+                raise MotorDecoratorValueError(f"{name} must be positive int!")
+        if not 0 < self.error_rate_threshold <= 1:
+            raise MotorDecoratorValueError(f"error_rate_threshold must be float between 0 and 1!")
+        if self.recovery_timeout <= 0:
+            raise MotorDecoratorValueError(f"recovery_timeout must be positive!")
+
+
+@dataclass
+class MotorDecoratorBreakerStats:
+    """DTO to collect statistic of circuit breaker"""
+    state: MotorDecoratorBreakerState = MotorDecoratorBreakerState.CLOSED
+    successes: int = 0
+    failures: int = 0
+    rejected: int = 0
+    opened: int = 0
+    half_opened: int = 0
+    closed: int = 0
+    last_transition: float | None = None
+
+
+@dataclass
+class MotorDecoratorFanOutResult:
+    """DTO of fan-out query: merged records, counts and outcome of every target ('cluster/database')"""
+    records: list = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=dict)
+    succeeded: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    timed_out: list[str] = field(default_factory=list)
+    durations: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed or self.timed_out)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+@dataclass
+class MotorDecoratorSyncResult:
+    """DTO of documents synchronization: 'merged' is count of documents written by '$merge' from staging collection"""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    merged: int = 0
+    failed: int = 0
+    writes: int = 0
+
+
+@dataclass
+class MotorDecoratorTimeSeries:
+    """DTO to declare time-series collection of the db class"""
+    collection: str
+    time_field: str
+    meta_field: str | None = None
+    granularity: str = "seconds"
+    expire_after_seconds: int | None = None
+    GRANULARITIES = ("seconds", "minutes", "hours")
+
+    def __post_init__(self) -> None:
+        if self.granularity not in self.GRANULARITIES:
+            raise MotorDecoratorValueError(f"granularity must be one of {self.GRANULARITIES}!")
+        if self.expire_after_seconds is not None and (
+                not isinstance(self.expire_after_seconds, int) or self.expire_after_seconds < 0
+        ):
+            raise MotorDecoratorValueError("expire_after_seconds must be non-negative int!")
+
+    def options(self) -> dict:
+        """Options of 'create_collection' command"""
+        timeseries = {"timeField": self.time_field, "granularity": self.granularity}
+        if self.meta_field is not None:
+            timeseries["metaField"] = self.meta_field
+        options: dict = {"timeseries": timeseries}
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return options
+
+
+@dataclass
+class MotorDecoratorIngestStats:
+    """DTO to collect statistic of time-series ingestion buffer"""
+    buffered: int = 0
+    written: int = 0
+    failed: int = 0
+    flushes: int = 0
+    last_flush_duration: float = 0.0
@@ -1,5 +1,9 @@
 from .exception import MotorDecoratorClustersNotRegistered
-from .objects import MotorDecoratorRegisteredCluster
+from .objects import (
+    MotorDecoratorRegisteredCluster,
+    MotorDecoratorConcurrencyParameters,
+    MotorDecoratorBreakerParameters
+)
 from .registrator import MotorDecoratorClustersRegistrator
 from .settings import MotorDecoratorSettings
 
@@ -11,9 +15,18 @@ def add_cluster(
         host: str,
         port: int | str,
         response_timeout: int = 10_000,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        collection_concurrency: int | None = None,
+        circuit_breaker: MotorDecoratorBreakerParameters | None = None,
         **kwargs
 ) -> None:
-    """Adds a new MotorDecoratorCluster to controller"""
+    """
+    Adds a new MotorDecoratorCluster to controller.
+    'max_concurrency' and 'collection_concurrency' limit concurrent calls to the cluster and to each its collection,
+     'max_queue' limits count of waiting calls, calls over the limit fail fast.
+    'circuit_breaker' turns on circuit breaker of the cluster
+    """
     MotorDecoratorProfiler.add_cluster(
         cluster_name=cluster_name,
         username=username,
@@ -21,13 +34,24 @@ def add_cluster(
         host=host,
         port=port,
         response_timeout=response_timeout,
+        concurrency=MotorDecoratorConcurrencyParameters(
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            collection_concurrency=collection_concurrency
+        ),
+        circuit_breaker=circuit_breaker,
         **kwargs
     )
 
 
-def profile_clusters(extended_logs: bool = False, log_level: str | None = None, ping: bool = False) -> None:
+def profile_clusters(
+        extended_logs: bool = False,
+        log_level: str | None = None,
+        ping: bool = False,
+        queue_logging: bool = False
+) -> None:
     """Prepare motor decorator to work"""
-    MotorDecoratorProfiler.profile(extended_logs, log_level, ping)
+    MotorDecoratorProfiler.profile(extended_logs, log_level, ping, queue_logging)
 
 
 def change_log_level(log_level: str) -> None:
@@ -40,6 +64,19 @@ def extend_logs_info(turn_on: bool) -> None:
     MotorDecoratorProfiler.extend_logs_info(turn_on)
 
 
+def throttle_error_logs(rate: int = 10, interval: float = 60.0) -> None:
+    """Limit count of similar error logs of database calls to 'rate' per 'interval' seconds"""
+    MotorDecoratorProfiler.throttle_error_logs(rate, interval)
+
+
+def advise_indexes(turn_on: bool, auto_hint: bool = False) -> None:
+    """
+    Collect query shapes for index advisor report.
+    With auto hint controller adds 'hint' of the best known index to queries without it
+    """
+    MotorDecoratorProfiler.advise_indexes(turn_on, auto_hint)
+
+
 class MotorDecoratorProfiler:
     settings = MotorDecoratorSettings()
     registrator = MotorDecoratorClustersRegistrator()
@@ -54,6 +91,8 @@ class MotorDecoratorProfiler:
             host: str,
             port: int | str,
             response_timeout: int,
+            concurrency: MotorDecoratorConcurrencyParameters,
+            circuit_breaker: MotorDecoratorBreakerParameters | None,
             **kwargs
     ) -> None:
         cls.registrator.registrate(
@@ -63,14 +102,18 @@ class MotorDecoratorProfiler:
             host=host,
             port=port,
             response_timeout=response_timeout,
+            concurrency=concurrency,
+            circuit_breaker=circuit_breaker,
             kwargs=kwargs
         )
 
     @classmethod
-    def profile(cls, extended_logs: bool, log_level: str | None, ping: bool) -> None:
+    def profile(cls, extended_logs: bool, log_level: str | None, ping: bool, queue_logging: bool) -> None:
         cls._set_extend_logs_state(extended_logs)
         if log_level:
             cls.change_log_level(log_level)
+        if queue_logging:
+            cls.settings.set_queue_logging(queue_logging)
         cls._check_registered_clusters()
         if ping:
             cls._ping_clusters()
@@ -87,6 +130,14 @@ class MotorDecoratorProfiler:
     def extend_logs_info(cls, turn_on: bool) -> None:
         cls.settings.extend_logs_info(turn_on)
 
+    @classmethod
+    def throttle_error_logs(cls, rate: int, interval: float) -> None:
+        cls.settings.throttle_error_logs(rate, interval)
+
+    @classmethod
+    def advise_indexes(cls, turn_on: bool, auto_hint: bool) -> None:
+        cls.settings.advise_indexes(turn_on, auto_hint)
+
     @classmethod
     def _check_registered_clusters(cls) -> None:
         is_not_empty: bool = cls.registrator.clusters_registered()
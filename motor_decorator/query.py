@@ -0,0 +1,177 @@
+from typing import Any, Callable
+
+from .abstract_view import MotorDecoratorViewClass
+from .exception import MotorDecoratorQueryError
+from .objects import MotorDecoratorQueryParam, MotorDecoratorIndex, MotorDecoratorCollectionName
+
+__all__ = ["MotorDecoratorQuery", "MotorDecoratorBoundQuery", "query_shape"]
+
+_Builder = Callable[[dict], Any]
+
+# Operations which return documents and accept projection
+_FIND_OPERATIONS = frozenset({"find_one", "find_many", "find_one_and_update"})
+_UPDATE_OPERATIONS = frozenset({"update_one", "update_many", "find_one_and_update"})
+_OPERATIONS = _FIND_OPERATIONS | _UPDATE_OPERATIONS | frozenset({"delete_one", "delete_many", "count", "aggregate"})
+
+# Query operators which contain list of sub conditions with fields
+_LOGICAL_OPERATORS = frozenset({"$and", "$or", "$nor"})
+
+
+def query_shape(document: Any) -> str:
+    """
+    Normalized shape of filter, sort or update document: values are replaced by '?',
+     field names and operators are kept. Documents which differ only by values have the same shape
+    """
+    if isinstance(document, dict):
+        return "{" + ",".join(f"{key}:{query_shape(value)}" for key, value in document.items()) + "}"
+    elif isinstance(document, (list, tuple)):
+        # Values list of '$in' like operators is a single value
+        if document and all(isinstance(item, (dict, list, tuple)) for item in document):
+            return "[" + ",".join(query_shape(item) for item in document) + "]"
+    return "?"
+
+
+class MotorDecoratorBoundQuery:
+    """Prepared query with bound values, ready to execute by controller"""
+
+    def __init__(self, query: "MotorDecoratorQuery", condition: dict | list, update: dict | list | None) -> None:
+        self.query = query
+        self.condition = condition
+        self.update = update
+
+    @property
+    def shape(self) -> str:
+        return self.query.shape
+
+
+class MotorDecoratorQuery:
+    """
+    Prepared query template. Declared once on db class, validated against view class fields
+     and compiled on creation. Values of 'MotorDecoratorQueryParam' placeholders are bound on call.
+    Documents of bound query share not parametrized parts with template and must not be mutated
+    """
+
+    def __init__(
+            self,
+            operation: str,
+            condition: dict | list,
+            update: dict | list | None = None,
+            view_class: MotorDecoratorViewClass | None = None,
+            projection: dict | None = None,
+            hint: MotorDecoratorIndex | list | str | None = None,
+            collection: str | None = None,
+            validate: bool = True,
+            **kwargs
+    ) -> None:
+        if operation not in _OPERATIONS:
+            raise MotorDecoratorQueryError(f"Unknown query operation '{operation}'. Available: {sorted(_OPERATIONS)}")
+        if operation in _UPDATE_OPERATIONS and update is None:
+            raise MotorDecoratorQueryError(f"Query operation '{operation}' requires update document")
+
+        self.name = operation
+        self.operation = operation
+        self.view_class = view_class
+        self.collection = MotorDecoratorCollectionName(collection) if collection else None
+
+        if validate and view_class is not None and operation != "aggregate":
+            fields = set(view_class.projection())
+            self._validate_condition(condition, fields)
+            if isinstance(update, dict):
+                self._validate_update(update, fields)
+
+        self.params: frozenset[str] = frozenset(self._collect_params(condition) + self._collect_params(update))
+        self.shape = f"{operation}:{query_shape(condition)}"
+        if update is not None:
+            self.shape += f":{query_shape(update)}"
+
+        self._condition = condition
+        self._update = update
+        self._condition_builder = self._compile(condition)
+        self._update_builder = self._compile(update)
+
+        self.kwargs = kwargs
+        if operation in _FIND_OPERATIONS:
+            if projection is None and view_class is not None:
+                projection = view_class.projection()
+            self.kwargs["projection"] = projection
+        if hint is not None:
+            self.kwargs["hint"] = hint.keys() if isinstance(hint, MotorDecoratorIndex) else hint
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, shape={self.shape})"
+
+    def bind(self, **values) -> MotorDecoratorBoundQuery:
+        if values.keys() != self.params:
+            missing = self.params - values.keys()
+            unknown = values.keys() - self.params
+            raise MotorDecoratorQueryError(
+                f"Wrong params for query '{self.name}'. Missing: {sorted(missing)}, unknown: {sorted(unknown)}"
+            )
+
+        condition = self._condition if self._condition_builder is None else self._condition_builder(values)
+        update = self._update if self._update_builder is None else self._update_builder(values)
+        return MotorDecoratorBoundQuery(self, condition, update)
+
+    @classmethod
+    def _compile(cls, node: Any) -> _Builder | None:
+        """Returns function which builds node copy with bound values or None if node has no params"""
+        if isinstance(node, MotorDecoratorQueryParam):
+            name = node.name
+            return lambda values: values[name]
+
+        if isinstance(node, dict):
+            items = [(key, value, cls._compile(value)) for key, value in node.items()]
+            if all(builder is None for _, _, builder in items):
+                return None
+            return lambda values: {
+                key: value if builder is None else builder(values) for key, value, builder in items
+            }
+
+        if isinstance(node, (list, tuple)):
+            items = [(value, cls._compile(value)) for value in node]
+            if all(builder is None for _, builder in items):
+                return None
+            container = type(node)
+            return lambda values: container(value if builder is None else builder(values) for value, builder in items)
+
+        return None
+
+    @classmethod
+    def _collect_params(cls, node: Any) -> list[str]:
+        if isinstance(node, MotorDecoratorQueryParam):
+            return [node.name]
+        elif isinstance(node, dict):
+            return [param for value in node.values() for param in cls._collect_params(value)]
+        elif isinstance(node, (list, tuple)):
+            return [param for value in node for param in cls._collect_params(value)]
+        return []
+
+    @classmethod
+    def _validate_condition(cls, condition: dict | list, fields: set[str]) -> None:
+        if not isinstance(condition, dict):
+            raise MotorDecoratorQueryError(f"Query condition must be a dict, not a {type(condition)}")
+
+        for key, value in condition.items():
+            if key in _LOGICAL_OPERATORS:
+                for sub_condition in value:
+                    cls._validate_condition(sub_condition, fields)
+            elif not key.startswith("$"):
+                cls._validate_field(key, fields)
+
+    @classmethod
+    def _validate_update(cls, update: dict, fields: set[str]) -> None:
+        for operator, value in update.items():
+            if not operator.startswith("$"):
+                raise MotorDecoratorQueryError(f"Update document must contain only operators, got '{operator}'")
+            if isinstance(value, dict):
+                for key in value:
+                    cls._validate_field(key, fields)
+
+    @staticmethod
+    def _validate_field(key: str, fields: set[str]) -> None:
+        field = key.split(".", 1)[0]
+        if field not in fields:
+            raise MotorDecoratorQueryError(f"Field '{key}' is not declared in view. View fields: {sorted(fields)}")
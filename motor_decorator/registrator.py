@@ -1,5 +1,11 @@
 from .controller import MotorDecoratorController
-from .objects import MotorDecoratorClusterName, MotorDecoratorRegisteredCluster, MotorDecoratorClusterUrl
+from .objects import (
+    MotorDecoratorClusterName,
+    MotorDecoratorRegisteredCluster,
+    MotorDecoratorClusterUrl,
+    MotorDecoratorConcurrencyParameters,
+    MotorDecoratorBreakerParameters
+)
 
 __all__ = ["MotorDecoratorClustersRegistrator", ]
 
@@ -19,8 +25,10 @@ class MotorDecoratorClustersRegistrator:
            host: str,
             port: int,
              response_timeout: int,
-              kwargs: dict
-              ) -> None`: Registers a cluster by calling the _wrap_registration
+              concurrency: MotorDecoratorConcurrencyParameters,
+               circuit_breaker: MotorDecoratorBreakerParameters | None,
+                kwargs: dict
+                ) -> None`: Registers a cluster by calling the _wrap_registration
     * method and adding the cluster to the MotorDecoratorController.
 
     Private Methods:
@@ -31,8 +39,10 @@ class MotorDecoratorClustersRegistrator:
            host: str,
             port: int,
              response_timeout: int,
-              kwargs: dict
-              ) -> MotorDecoratorRegisteredCluster`: Wraps the registration
+              concurrency: MotorDecoratorConcurrencyParameters,
+               circuit_breaker: MotorDecoratorBreakerParameters | None,
+                kwargs: dict
+                ) -> MotorDecoratorRegisteredCluster`: Wraps the registration
     * process by creating a MotorDecoratorRegisteredCluster object with the provided parameters.
 
     """
@@ -45,6 +55,8 @@ class MotorDecoratorClustersRegistrator:
             host: str,
             port: int | str,
             response_timeout: int,
+            concurrency: MotorDecoratorConcurrencyParameters,
+            circuit_breaker: MotorDecoratorBreakerParameters | None,
             kwargs: dict
     ) -> None:
         cluster = self._wrap_registration(
@@ -54,6 +66,8 @@ class MotorDecoratorClustersRegistrator:
             host=host,
             port=port,
             response_timeout=response_timeout,
+            concurrency=concurrency,
+            circuit_breaker=circuit_breaker,
             kwargs=kwargs
         )
         MotorDecoratorController.add_cluster(cluster)
@@ -66,6 +80,8 @@ class MotorDecoratorClustersRegistrator:
             host: str,
             port: int | str,
             response_timeout: int,
+            concurrency: MotorDecoratorConcurrencyParameters,
+            circuit_breaker: MotorDecoratorBreakerParameters | None,
             kwargs: dict
     ) -> MotorDecoratorRegisteredCluster:
         return MotorDecoratorRegisteredCluster(
@@ -77,6 +93,8 @@ class MotorDecoratorClustersRegistrator:
                 port=port
             ),
             response_timeout=response_timeout,
+            concurrency=concurrency,
+            circuit_breaker=circuit_breaker,
             **kwargs
         )
 
@@ -9,14 +9,25 @@ class MotorDecoratorSettings:
 
     @staticmethod
     def change_log_level(log_level: str) -> None:
-        db_tools.LOGGING_LEVEL = log_level
-        logger = db_tools.get_logger()
-        MotorDecoratorController.logger = logger
+        db_tools.set_log_level(log_level)
+
+    @staticmethod
+    def set_queue_logging(turn_on: bool) -> None:
+        db_tools.set_queue_logging(turn_on)
+
+    @staticmethod
+    def throttle_error_logs(rate: int, interval: float) -> None:
+        db_tools.log_throttle.configure(rate, interval)
 
     @staticmethod
     def extend_logs_info(turn_on: bool) -> None:
         MotorDecoratorController.EXTENDED_LOGS = turn_on
 
+    @staticmethod
+    def advise_indexes(turn_on: bool, auto_hint: bool) -> None:
+        MotorDecoratorController.QUERY_ADVISOR = turn_on
+        MotorDecoratorController.AUTO_HINT = auto_hint
+
     @staticmethod
     def ping_clusters() -> None:
         MotorDecoratorController.ping_clusters()
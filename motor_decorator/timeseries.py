@@ -0,0 +1,126 @@
+import asyncio
+import time
+from contextlib import suppress
+from operator import itemgetter
+from types import TracebackType
+from typing import Any, Hashable, Iterable, Self, Type
+
+from .controller import MotorDecoratorController, logger
+from .exception import MotorDecoratorValueError
+from .objects import MotorDecoratorTimeSeries, MotorDecoratorIngestStats
+
+__all__ = ["MotorDecoratorTimeSeriesWriter", ]
+
+
+def _meta_key(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple((key, _meta_key(item)) for key, item in sorted(value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_meta_key(item) for item in value)
+    return value
+
+
+class MotorDecoratorTimeSeriesWriter:
+    """
+    Ingestion buffer of time-series collection. Points are buffered per meta key and written by sorted batches:
+     points of one meta key go together in time order, so they fill the same buckets.
+    Buffer is flushed when 'max_points' are buffered, every 'flush_interval' seconds inside 'async with'
+     and on exit from it. Points of failed batch (after retries) are counted in 'stats.failed'.
+    Writer uses own handle of the collection, current collection of the controller is not changed
+    """
+
+    def __init__(
+            self,
+            controller: MotorDecoratorController,
+            time_series: MotorDecoratorTimeSeries,
+            max_points: int = 1_000,
+            flush_interval: float | None = 1.0,
+            ordered: bool = False
+    ) -> None:
+        if max_points < 1:
+            raise MotorDecoratorValueError("max_points must be positive int!")
+        self.controller = controller
+        self.time_series = time_series
+        self.max_points = max_points
+        self.flush_interval = flush_interval
+        self.ordered = ordered
+        self.stats = MotorDecoratorIngestStats()
+        self._buffer: dict[Hashable, list[dict]] = dict()
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        if self.flush_interval is not None and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        # Waits on the lock for the batch which was being written by the cancelled task
+        await self.flush()
+
+    async def add(self, point: dict) -> None:
+        if self.time_series.time_field not in point:
+            raise MotorDecoratorValueError(f"Point has no time field '{self.time_series.time_field}'")
+
+        meta_field = self.time_series.meta_field
+        key = _meta_key(point.get(meta_field)) if meta_field is not None else None
+        self._buffer.setdefault(key, []).append(point)
+        self.stats.buffered += 1
+        if self.stats.buffered >= self.max_points:
+            await self.flush()
+
+    async def add_many(self, points: Iterable[dict]) -> None:
+        for point in points:
+            await self.add(point)
+
+    async def flush(self) -> int:
+        """Write buffered points, returns count of written points"""
+        async with self._lock:
+            if not self._buffer:
+                return 0
+            buffer, self._buffer = self._buffer, dict()
+            self.stats.buffered = 0
+
+            by_time = itemgetter(self.time_series.time_field)
+            batch = []
+            for points in buffer.values():
+                points.sort(key=by_time)
+                batch.extend(points)
+
+            started = time.perf_counter()
+            collection = self.controller.database[self.time_series.collection]
+            response = await self.controller._execute(
+                function=collection.insert_many,
+                documents=batch,
+                ordered=self.ordered,
+                **self.controller._with_session(dict())
+            )
+            self.stats.flushes += 1
+            self.stats.last_flush_duration = time.perf_counter() - started
+            if response is None:
+                self.stats.failed += len(batch)
+                return 0
+            self.stats.written += len(batch)
+            return len(batch)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                # Cancellation on close must not drop the batch which is being written
+                await asyncio.shield(self.flush())
+            except Exception as ex:
+                logger.error("Flush of '%s' time-series buffer failed: %r", self.time_series.collection, ex)
@@ -1,20 +1,77 @@
 import asyncio
+import atexit
 import functools
 import logging
-from typing import Callable, Any
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Any, Hashable
 
-from pymongo.errors import DuplicateKeyError, BulkWriteError
+from pymongo.errors import DuplicateKeyError, BulkWriteError, PyMongoError
 
+from .advisor import auto_hinted, is_rejected_hint
+from .deadline import call_within_deadline, check_deadline, remaining_time
+from .exception import (
+    MotorDecoratorBadHintError,
+    MotorDecoratorQueueOverflowError,
+    MotorDecoratorCircuitOpenError,
+    MotorDecoratorDeadlineExceededError
+)
 from .objects import MotorDecoratorRetryParameters
 
 
+class MotorDecoratorLogThrottle:
+    """
+    Limits count of similar log records (same key) to 'rate' per 'interval' seconds,
+     so retry storms during cluster outage don't flood logs
+    """
+
+    def __init__(self, rate: int = 10, interval: float = 60.0) -> None:
+        self.rate = rate
+        self.interval = interval
+        self._windows: dict[Hashable, list] = dict()
+
+    def configure(self, rate: int, interval: float) -> None:
+        self.rate = rate
+        self.interval = interval
+        self._windows.clear()
+
+    def allow(self, key: Hashable) -> int | None:
+        """Returns count of suppressed records since last allowed one or None if record must be suppressed"""
+        now = time.monotonic()
+        # [window start, emitted records, suppressed records]
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            return suppressed
+
+        if window[1] < self.rate:
+            window[1] += 1
+            suppressed, window[2] = window[2], 0
+            return suppressed
+
+        window[2] += 1
+        return None
+
+
 class MotorDecoratorTools:
     info_format: str = "[%(asctime)s] [%(name)s] [%(levelname)s]: %(message)s [%(filename)s/%(funcName)s:%(lineno)d]"
+    logger_name: str = "motor-decorator"
     LOGGING_LEVEL: str = "INFO"
     base_retry_param: MotorDecoratorRetryParameters = MotorDecoratorRetryParameters()
+    log_throttle: MotorDecoratorLogThrottle = MotorDecoratorLogThrottle()
+    _handler: logging.Handler | None = None
+    _listener: QueueListener | None = None
 
     @staticmethod
     def retry(logger: logging.Logger, init_retries: int = 3, timeout: int = 1) -> Callable:
+        """
+        Retry decorator for database calls.
+        If 'circuit_breaker' argument is passed, every attempt goes through the cluster circuit breaker
+         and retries stop as soon as breaker is open.
+        Attempts and delays between them are limited by remaining time of 'call_deadline' context
+        """
         def send_request(func: Callable) -> Callable:
             @functools.wraps(func)
             async def wrap(*args, **kwargs) -> Any | None:
@@ -23,72 +80,192 @@ class MotorDecoratorTools:
                 delay = timeout
 
                 retry_param = kwargs.pop("retry_param", MotorDecoratorTools.base_retry_param)
+                circuit_breaker = kwargs.pop("circuit_breaker", None)
 
                 while retries:
                     try:
-                        return await func(*args, **kwargs)
-                    except DuplicateKeyError as ex:
-                        error_message = (
-                            f"DuplicateKeyError (retry={retries % 4}). "
-                            f"execution function: <{func.__name__}>, "
-                            f"exception description: {ex}"
+                        call = func
+                        if remaining_time() is not None:
+                            check_deadline(func)
+                            call = functools.partial(call_within_deadline, func)
+                        if circuit_breaker is None:
+                            return await call(*args, **kwargs)
+                        with circuit_breaker.guard():
+                            return await call(*args, **kwargs)
+                    except (
+                            MotorDecoratorQueueOverflowError,
+                            MotorDecoratorCircuitOpenError,
+                            MotorDecoratorDeadlineExceededError
+                    ) as ex:
+                        # Fail fast: retry of rejected call amplifies the overload, expired deadline leaves no time
+                        MotorDecoratorTools.log_throttled(
+                            logger, logging.WARNING, "%s. execution function: <%s>", ex, func.__name__,
+                            key=(func.__qualname__, ex.__class__)
                         )
-
+                        return
+                    except DuplicateKeyError as ex:
                         if retry_param.skip_duplicate_key_error_info is False:
-                            logger.error(error_message)
+                            MotorDecoratorTools._log_retry_error(logger, "DuplicateKeyError", func, retries, ex)
                         return
                     except BulkWriteError as ex:
-                        error_message = (
-                            f"BulkWriteError (retry={retries % 4}). "
-                            f"execution function: <{func.__name__}>, "
-                            f"exception description: {ex}"
-                        )
                         if error_description := ex.details.get('writeErrors', []):
                             if "E11000" in error_description[0].get("errmsg", ""):
                                 if retry_param.skip_duplicate_key_error_info is False:
-                                    logger.error(error_message)
+                                    MotorDecoratorTools._log_retry_error(logger, "BulkWriteError", func, retries, ex)
                                 return
 
-                        logger.error(error_message)
+                        MotorDecoratorTools._log_retry_error(logger, "BulkWriteError", func, retries, ex)
                         retries -= 1
-                        await asyncio.sleep(delay)
+                        if circuit_breaker is not None and circuit_breaker.is_open:
+                            return
+                        await MotorDecoratorTools._retry_delay(delay)
                         delay *= 2
                     except Exception as ex:
-                        error_message = (
-                            f"Database connection error (retry={retries % 4}). "
-                            f"execution function: <{func.__name__}>, "
-                            f"exception class: <{ex.__class__.__name__}>, "
-                            f"exception description: {ex}"
-                        )
-                        logger.error(error_message)
+                        if auto_hinted.get() and is_rejected_hint(ex):
+                            # Retry with the same hint fails again, caller repeats query without hint
+                            raise MotorDecoratorBadHintError(str(ex)) from ex
+                        MotorDecoratorTools._log_retry_error(logger, "Database connection error", func, retries, ex)
                         retries -= 1
-                        await asyncio.sleep(delay)
+                        if circuit_breaker is not None and circuit_breaker.is_open:
+                            return
+                        await MotorDecoratorTools._retry_delay(delay)
                         delay *= 2
                     finally:
                         if retries == 0:
-                            error_message = (
-                                f"All database retries is finished."
-                                f" Check cluster availability."
+                            MotorDecoratorTools.log_throttled(
+                                logger, logging.ERROR, "All database retries is finished. Check cluster availability.",
+                                key=(func.__qualname__, "retries finished")
                             )
-                            logger.exception(error_message)
                             return
 
             return wrap
 
         return send_request
 
-    def get_logger(self) -> logging.Logger:
-        formatter = logging.Formatter(fmt=self.info_format)
-        handler = logging.StreamHandler()
-        handler.setFormatter(formatter)
+    @staticmethod
+    async def _retry_delay(delay: float) -> None:
+        remaining = remaining_time()
+        if remaining is not None:
+            # Next attempt fails fast when deadline is reached
+            delay = max(0.0, min(delay, remaining))
+        await asyncio.sleep(delay)
 
-        logger = logging.getLogger("motor-decorator")
-        logger.handlers.clear()
+    @staticmethod
+    def transaction_retry(logger: logging.Logger, *error_labels: str, init_retries: int = 3,
+                          timeout: int = 1) -> Callable:
+        """
+        Retry decorator for transaction operations.
+        Repeats the call only for errors marked by driver with one of the error labels
+         (TransientTransactionError, UnknownTransactionCommitResult), other errors are raised
+        """
 
-        logger.setLevel(self.LOGGING_LEVEL)
-        logger.addHandler(handler)
+        def send_request(func: Callable) -> Callable:
+            @functools.wraps(func)
+            async def wrap(*args, **kwargs) -> Any:
+                retries = init_retries
+                delay = timeout
+
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except PyMongoError as ex:
+                        label = next((label for label in error_labels if ex.has_error_label(label)), None)
+                        retries -= 1
+                        if label is None or retries <= 0:
+                            raise
+                        logger.warning(
+                            "%s (retry=%d). execution function: <%s>, exception description: %s",
+                            label, init_retries - retries, func.__name__, ex
+                        )
+                        await MotorDecoratorTools._retry_delay(delay)
+                        delay *= 2
+
+            return wrap
 
+        return send_request
+
+    @staticmethod
+    def _log_retry_error(logger: logging.Logger, title: str, func: Callable, retries: int, ex: Exception) -> None:
+        MotorDecoratorTools.log_throttled(
+            logger,
+            logging.ERROR,
+            "%s (retry=%d). execution function: <%s>, exception class: <%s>, exception description: %s",
+            title, retries % 4, func.__name__, ex.__class__.__name__, ex,
+            key=(func.__qualname__, ex.__class__),
+            stacklevel=3
+        )
+
+    @staticmethod
+    def log_throttled(
+            logger: logging.Logger,
+            level: int,
+            message: str,
+            *args,
+            key: Hashable,
+            stacklevel: int = 2
+    ) -> None:
+        """
+        Lazy formatted log record limited by log throttle for the key.
+        Count of suppressed records is added to the next emitted record
+        """
+        if not logger.isEnabledFor(level):
+            return
+
+        suppressed = MotorDecoratorTools.log_throttle.allow(key)
+        if suppressed is None:
+            return
+        if suppressed:
+            message += " (%d similar messages suppressed)"
+            args += (suppressed,)
+        logger.log(level, message, *args, stacklevel=stacklevel)
+
+    def get_logger(self) -> logging.Logger:
+        """Logger of the library. Handler is created once, next calls only update the level"""
+        logger = logging.getLogger(self.logger_name)
+        if self._handler is None:
+            formatter = logging.Formatter(fmt=self.info_format)
+            self._handler = logging.StreamHandler()
+            self._handler.setFormatter(formatter)
+            logger.handlers.clear()
+            logger.addHandler(self._handler)
+
+        logger.setLevel(self.LOGGING_LEVEL)
         return logger
 
+    def set_log_level(self, log_level: str) -> None:
+        self.LOGGING_LEVEL = log_level
+        logging.getLogger(self.logger_name).setLevel(log_level)
+
+    def set_queue_logging(self, turn_on: bool) -> None:
+        """
+        Move writing of log records to the background thread, so logging call doesn't block event loop on IO.
+        Records are put to the queue by QueueHandler and written by library handler in QueueListener thread
+        """
+        logger = self.get_logger()
+        if turn_on and self._listener is None:
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            self._listener = QueueListener(log_queue, self._handler, respect_handler_level=True)
+            self._listener.start()
+            logger.removeHandler(self._handler)
+            logger.addHandler(QueueHandler(log_queue))
+            atexit.register(self._listener.stop)
+        elif not turn_on and self._listener is not None:
+            self._listener.stop()
+            atexit.unregister(self._listener.stop)
+            self._listener = None
+            logger.handlers.clear()
+            logger.addHandler(self._handler)
+
+    def restart_queue_logging(self) -> None:
+        """Listener thread doesn't survive fork, so the child process gets new queue and listener"""
+        if self._listener is None:
+            return
+        atexit.unregister(self._listener.stop)
+        self._listener = None
+        logger = logging.getLogger(self.logger_name)
+        logger.handlers.clear()
+        logger.addHandler(self._handler)
+        self.set_queue_logging(True)
+
 
 db_tools = MotorDecoratorTools()
@@ -2,7 +2,7 @@ from setuptools import find_packages, setup
 
 setup(
     name="motor-decorator",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     version="0.0.3.8",
     description="Decorator for motor library",
     author="Timur Galiev",
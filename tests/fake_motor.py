@@ -0,0 +1,90 @@
+import asyncio
+import inspect
+import unittest
+from typing import Any, Callable
+from unittest import mock
+
+import motor.frameworks.asyncio as motor_asyncio
+from pymongo.client_session import ClientSession, SessionOptions, _ServerSession, _TxnState
+from pymongo.command_cursor import CommandCursor
+
+from motor_decorator import add_cluster, extend_logs_info
+from motor_decorator.controller import MotorDecoratorController
+from motor_decorator.objects import MotorDecoratorClusterName, MotorDecoratorDatabaseName
+
+extend_logs_info(False)
+
+
+class FakeMotor:
+    """
+    Answers pymongo calls which motor sends to the executor, so real motor objects are tested without Mongo.
+    Handler of pymongo method gets pymongo object (delegate) and arguments of the call, it may be async
+    """
+
+    def __init__(self, test_case: unittest.TestCase) -> None:
+        self.handlers: dict[str, Callable[..., Any]] = {
+            "start_session": self.start_session,
+            "commit_transaction": self.commit_transaction,
+            "abort_transaction": self.abort_transaction,
+        }
+        self.calls: list[tuple[str, Any, tuple, dict]] = []
+        patcher = mock.patch.object(motor_asyncio, "run_on_executor", self.run_on_executor)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+
+    def on(self, name: str, handler: Callable[..., Any]) -> None:
+        self.handlers[name] = handler
+
+    def called(self, name: str) -> list[tuple[Any, tuple, dict]]:
+        return [(delegate, args, kwargs) for called_name, delegate, args, kwargs in self.calls if called_name == name]
+
+    def run_on_executor(self, loop, function: Callable, delegate: Any, *args, **kwargs) -> asyncio.Future:
+        return asyncio.ensure_future(self._call(function.__name__, delegate, *args, **kwargs))
+
+    async def _call(self, name: str, delegate: Any, *args, **kwargs) -> Any:
+        self.calls.append((name, delegate, args, kwargs))
+        handler = self.handlers.get(name)
+        if handler is None:
+            return None
+        result = handler(delegate, *args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    @staticmethod
+    def start_session(client: Any, **kwargs) -> ClientSession:
+        # Real 'start_session' selects server to check sessions support.
+        # Dirty server session isn't pooled, so 'close' of the client doesn't send 'endSessions'
+        server_session = _ServerSession(0)
+        server_session.mark_dirty()
+        return ClientSession(client, server_session, SessionOptions(**kwargs), False)
+
+    @staticmethod
+    def commit_transaction(session: ClientSession) -> None:
+        session._transaction.state = _TxnState.COMMITTED
+
+    @staticmethod
+    def abort_transaction(session: ClientSession) -> None:
+        # Session which is ended inside transaction aborts it by real call
+        session._transaction.state = _TxnState.ABORTED
+
+
+def command_cursor(database: Any, documents: list[dict]) -> CommandCursor:
+    """Cursor with the whole result in the first batch, iteration doesn't call the server"""
+    reply = {"id": 0, "firstBatch": documents, "ns": f"{database.name}.$cmd.aggregate"}
+    return CommandCursor(database["$cmd"], reply, None)
+
+
+def make_controller(
+        test_case: unittest.TestCase,
+        cluster: str,
+        database: str = "TEST",
+        **kwargs
+) -> MotorDecoratorController:
+    """Controller of the cluster registered with 'add_cluster' kwargs, it is closed on test cleanup"""
+    add_cluster(cluster, username="user", password="password", host="localhost", port=27017, **kwargs)
+    controller = MotorDecoratorController(
+        MotorDecoratorClusterName(cluster), MotorDecoratorDatabaseName(database), False
+    )
+    test_case.addCleanup(controller.close)
+    return controller
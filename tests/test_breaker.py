@@ -0,0 +1,194 @@
+import logging
+import unittest
+from unittest import mock
+
+from pymongo.errors import AutoReconnect, DuplicateKeyError, ExecutionTimeout
+from pymongo.results import InsertOneResult
+
+from motor_decorator import MotorDecoratorBreakerParameters, call_deadline
+from motor_decorator.breaker import MotorDecoratorCircuitBreaker
+from motor_decorator.exception import (
+    MotorDecoratorCircuitOpenError,
+    MotorDecoratorDeadlineExceededError,
+    MotorDecoratorQueueOverflowError
+)
+from motor_decorator.objects import MotorDecoratorBreakerState, MotorDecoratorCollectionName
+from tests.fake_motor import FakeMotor, make_controller
+
+logger = logging.getLogger("motor-decorator-test")
+
+CLOSED = MotorDecoratorBreakerState.CLOSED
+OPEN = MotorDecoratorBreakerState.OPEN
+HALF_OPEN = MotorDecoratorBreakerState.HALF_OPEN
+
+
+def execution_timeout() -> ExecutionTimeout:
+    return ExecutionTimeout("operation exceeded time limit", 50, {"ok": 0, "code": 50})
+
+
+def make_breaker(response_timeout: float | None = 10.0, **parameters) -> MotorDecoratorCircuitBreaker:
+    return MotorDecoratorCircuitBreaker(
+        "MAIN", MotorDecoratorBreakerParameters(**parameters), logger, response_timeout=response_timeout
+    )
+
+
+def call(breaker: MotorDecoratorCircuitBreaker, error: Exception | None = None) -> None:
+    try:
+        with breaker.guard():
+            if error is not None:
+                raise error
+    except Exception as ex:
+        if ex is not error:
+            raise
+
+
+class BreakerStateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch("motor_decorator.breaker.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_breaker(self, breaker: MotorDecoratorCircuitBreaker) -> None:
+        for _ in range(breaker.parameters.failure_threshold):
+            call(breaker, AutoReconnect())
+        self.assertIs(breaker.state, OPEN)
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        breaker = make_breaker(failure_threshold=3)
+        call(breaker, AutoReconnect())
+        call(breaker, AutoReconnect())
+        call(breaker)
+        call(breaker, AutoReconnect())
+        call(breaker, AutoReconnect())
+        self.assertIs(breaker.state, CLOSED)
+        call(breaker, AutoReconnect())
+        self.assertIs(breaker.state, OPEN)
+        self.assertEqual((breaker.stats.failures, breaker.stats.successes), (5, 1))
+
+    def test_opens_by_error_rate(self) -> None:
+        breaker = make_breaker(failure_threshold=100, error_rate_threshold=0.5, window_size=4, min_calls=4)
+        for error in (AutoReconnect(), None, None):
+            call(breaker, error)
+        self.assertIs(breaker.state, CLOSED)
+        call(breaker, AutoReconnect())
+        self.assertIs(breaker.state, OPEN)
+        self.assertEqual(breaker.stats.failures, 2)
+
+    def test_error_of_working_cluster_is_success(self) -> None:
+        breaker = make_breaker(failure_threshold=1)
+        call(breaker, DuplicateKeyError("E11000 duplicate key error"))
+        self.assertIs(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats.successes, 1)
+
+    def test_open_breaker_rejects_until_recovery_timeout(self) -> None:
+        breaker = make_breaker(failure_threshold=1, recovery_timeout=30)
+        self.open_breaker(breaker)
+        with self.assertRaises(MotorDecoratorCircuitOpenError):
+            call(breaker)
+        self.assertEqual(breaker.stats.rejected, 1)
+        self.now += 30
+        call(breaker)
+        self.assertIs(breaker.state, CLOSED)
+
+    def test_half_open_probe_limit(self) -> None:
+        breaker = make_breaker(failure_threshold=1, recovery_timeout=30, half_open_probes=2)
+        self.open_breaker(breaker)
+        self.now += 30
+        first, second = breaker.guard(), breaker.guard()
+        first.__enter__()
+        second.__enter__()
+        self.assertIs(breaker.state, HALF_OPEN)
+        with self.assertRaises(MotorDecoratorCircuitOpenError):
+            call(breaker)
+        first.__exit__(None, None, None)
+        self.assertIs(breaker.state, HALF_OPEN)
+        second.__exit__(None, None, None)
+        self.assertIs(breaker.state, CLOSED)
+
+    def test_failed_probe_opens_breaker_again(self) -> None:
+        breaker = make_breaker(failure_threshold=1, recovery_timeout=30)
+        self.open_breaker(breaker)
+        self.now += 30
+        call(breaker, AutoReconnect())
+        self.assertIs(breaker.state, OPEN)
+        self.assertEqual(breaker.stats.opened, 2)
+
+    def test_neutral_errors_release_probe(self) -> None:
+        breaker = make_breaker(failure_threshold=1, recovery_timeout=30)
+        self.open_breaker(breaker)
+        self.now += 30
+        for error in (MotorDecoratorQueueOverflowError("queue is full"), MotorDecoratorDeadlineExceededError("late")):
+            call(breaker, error)
+            self.assertIs(breaker.state, HALF_OPEN)
+        self.assertEqual((breaker.stats.failures, breaker.stats.successes), (1, 0))
+        call(breaker)
+        self.assertIs(breaker.state, CLOSED)
+
+    def test_listeners_get_transitions(self) -> None:
+        breaker = make_breaker(failure_threshold=1, recovery_timeout=30)
+        transitions = []
+        breaker.add_listener(lambda name, old, new: transitions.append((name, old, new)))
+        self.open_breaker(breaker)
+        self.now += 30
+        call(breaker)
+        self.assertEqual(transitions, [("MAIN", CLOSED, OPEN), ("MAIN", OPEN, HALF_OPEN), ("MAIN", HALF_OPEN, CLOSED)])
+        self.assertEqual((breaker.stats.opened, breaker.stats.half_opened, breaker.stats.closed), (1, 1, 1))
+
+
+class BreakerDeadlineTest(unittest.TestCase):
+    def test_timeout_within_short_budget_is_not_counted(self) -> None:
+        breaker = make_breaker(failure_threshold=3)
+        for _ in range(3):
+            with call_deadline(0.005):
+                call(breaker, execution_timeout())
+        self.assertIs(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats.failures, 0)
+
+    def test_timeout_within_budget_of_response_timeout_is_counted(self) -> None:
+        breaker = make_breaker(failure_threshold=3)
+        for _ in range(3):
+            with call_deadline(30.0):
+                call(breaker, execution_timeout())
+        self.assertIs(breaker.state, OPEN)
+
+    def test_timeout_without_deadline_is_counted(self) -> None:
+        breaker = make_breaker(failure_threshold=3)
+        for _ in range(3):
+            call(breaker, execution_timeout())
+        self.assertIs(breaker.state, OPEN)
+
+
+class ControllerBreakerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.motor = FakeMotor(self)
+        self.controller = make_controller(
+            self, "BREAKER_TEST", circuit_breaker=MotorDecoratorBreakerParameters(failure_threshold=1)
+        )
+        await self.controller(MotorDecoratorCollectionName("VENDORS"))
+
+    async def test_open_breaker_stops_retries_and_fails_fast(self) -> None:
+        def insert_one(collection, document, **kwargs):
+            raise AutoReconnect("connection refused")
+
+        self.motor.on("insert_one", insert_one)
+        self.assertFalse(await self.controller.do_insert_one({"vendor": 1}))
+        self.assertIs(self.controller.circuit_breaker.state, OPEN)
+        self.assertFalse(await self.controller.do_insert_one({"vendor": 2}))
+        self.assertEqual(len(self.motor.called("insert_one")), 1)
+        self.assertEqual(self.controller.circuit_breaker.stats.rejected, 1)
+
+    async def test_timeout_of_short_deadline_leaves_breaker_closed(self) -> None:
+        def insert_one(collection, document, **kwargs):
+            raise execution_timeout()
+
+        self.motor.on("insert_one", insert_one)
+        with call_deadline(0.005):
+            await self.controller.do_insert_one({"vendor": 1})
+        self.assertIs(self.controller.circuit_breaker.state, CLOSED)
+        self.motor.on("insert_one", lambda collection, document, **kwargs: InsertOneResult(None, True))
+        self.assertTrue(await self.controller.do_insert_one({"vendor": 2}))
+
+
+if __name__ == "__main__":
+    unittest.main()
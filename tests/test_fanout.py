@@ -0,0 +1,35 @@
+import datetime as dt
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+
+from motor_decorator import MotorDecoratorFanOut
+from tests.fake_motor import make_controller
+
+
+class FanOutSortTest(unittest.IsolatedAsyncioTestCase):
+    def target(self, cluster: str, records: list[dict]):
+        controller = make_controller(self, cluster)
+        controller.do_find_many = mock.AsyncMock(return_value=records)
+        return controller
+
+    async def test_merge_of_mixed_types_follows_bson_order(self) -> None:
+        object_id = ObjectId()
+        now = dt.datetime.now()
+        first = self.target("FAN_OUT_FIRST", [{"v": None}, {"v": 2}, {"v": "b"}, {"v": now}])
+        second = self.target("FAN_OUT_SECOND", [{"v": 1.5}, {"v": "a"}, {"v": object_id}, {"v": True}])
+
+        result = await MotorDecoratorFanOut(first, second).find_many({}, sort=[("v", 1)])
+        self.assertEqual([record["v"] for record in result.records], [None, 1.5, 2, "a", "b", object_id, True, now])
+        self.assertEqual(sorted(result.succeeded), ["FAN_OUT_FIRST/TEST", "FAN_OUT_SECOND/TEST"])
+
+        # Every target returns records sorted by the query
+        for controller in (first, second):
+            controller.do_find_many.return_value = controller.do_find_many.return_value[::-1]
+        result = await MotorDecoratorFanOut(first, second).find_many({}, sort=[("v", -1)])
+        self.assertEqual([record["v"] for record in result.records], [now, True, object_id, "b", "a", 2, 1.5, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import unittest
+
+from pymongo.results import InsertOneResult
+
+from motor_decorator import MotorDecoratorPriority, call_priority
+from motor_decorator.exception import MotorDecoratorQueueOverflowError
+from motor_decorator.limiter import MotorDecoratorLimiter
+from motor_decorator.objects import MotorDecoratorCollectionName
+from tests.fake_motor import FakeMotor, make_controller
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class LimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_waiters_are_served_by_priority_then_arrival(self) -> None:
+        limiter = MotorDecoratorLimiter("MAIN", 1)
+        served = []
+
+        async def call(name: str, priority: int) -> None:
+            await limiter.acquire(priority)
+            served.append(name)
+            limiter.release()
+
+        await limiter.acquire()
+        tasks = []
+        for name, priority in [
+            ("batch", MotorDecoratorPriority.BATCH),
+            ("default", MotorDecoratorPriority.DEFAULT),
+            ("interactive", MotorDecoratorPriority.INTERACTIVE),
+            ("default later", MotorDecoratorPriority.DEFAULT),
+        ]:
+            tasks.append(asyncio.create_task(call(name, priority)))
+            await settle()
+        self.assertEqual(limiter.queue_depth, 4)
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(served, ["interactive", "default", "default later", "batch"])
+        self.assertEqual((limiter.active, limiter.queue_depth), (0, 0))
+        self.assertEqual(limiter.stats.max_queue_depth, 4)
+
+    async def test_priority_of_call_context(self) -> None:
+        limiter = MotorDecoratorLimiter("MAIN", 1)
+        served = []
+
+        async def call(name: str) -> None:
+            async with limiter():
+                served.append(name)
+
+        await limiter.acquire()
+        tasks = []
+        for name, priority in [
+            ("batch", MotorDecoratorPriority.BATCH),
+            ("default", MotorDecoratorPriority.DEFAULT),
+            ("interactive", MotorDecoratorPriority.INTERACTIVE),
+        ]:
+            # Task copies priority of the context where it is created
+            with call_priority(priority):
+                tasks.append(asyncio.create_task(call(name)))
+        await settle()
+        limiter.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(served, ["interactive", "default", "batch"])
+
+    async def test_full_queue_rejects(self) -> None:
+        limiter = MotorDecoratorLimiter("MAIN", 1, max_queue=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        with self.assertRaises(MotorDecoratorQueueOverflowError):
+            await limiter.acquire()
+        self.assertEqual(limiter.stats.rejected, 1)
+        limiter.release()
+        await waiter
+        self.assertEqual((limiter.active, limiter.queue_depth), (1, 0))
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        limiter = MotorDecoratorLimiter("MAIN", 1)
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        cancelled.cancel()
+        await settle()
+        self.assertEqual(limiter.queue_depth, 1)
+        limiter.release()
+        await waiter
+        limiter.release()
+        self.assertEqual((limiter.active, limiter.queue_depth), (0, 0))
+
+    async def test_cancellation_after_handover_releases_slot(self) -> None:
+        limiter = MotorDecoratorLimiter("MAIN", 1)
+        await limiter.acquire()
+        handed_over = asyncio.create_task(limiter.acquire())
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        # Slot is handed over and the waiter is cancelled before it wakes up
+        limiter.release()
+        handed_over.cancel()
+        await settle()
+        self.assertTrue(handed_over.cancelled())
+        await waiter
+        self.assertEqual((limiter.active, limiter.queue_depth), (1, 0))
+        limiter.release()
+        self.assertEqual(limiter.active, 0)
+
+
+class ControllerLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_calls_over_queue_fail_fast(self) -> None:
+        motor = FakeMotor(self)
+        release = asyncio.Event()
+
+        async def insert_one(collection, document, **kwargs):
+            await release.wait()
+            return InsertOneResult(None, True)
+
+        motor.on("insert_one", insert_one)
+        controller = make_controller(self, "LIMITER_TEST", max_concurrency=1, max_queue=1)
+        await controller(MotorDecoratorCollectionName("VENDORS"))
+
+        calls = [asyncio.create_task(controller.do_insert_one({"vendor": vendor})) for vendor in range(3)]
+        await settle()
+        self.assertTrue(calls[2].done())
+        self.assertFalse(calls[2].result())
+        release.set()
+        self.assertEqual(await asyncio.gather(*calls[:2]), [True, True])
+        self.assertEqual(len(motor.called("insert_one")), 2)
+        self.assertEqual(controller.limiters["LIMITER_TEST"].stats.rejected, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+from motor_decorator.tools import db_tools
+
+
+class QueueLoggingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = db_tools.get_logger()
+        self.output = tempfile.TemporaryFile("w+")
+        self.addCleanup(self.output.close)
+        stream = db_tools._handler.setStream(self.output)
+        self.addCleanup(db_tools._handler.setStream, stream)
+        db_tools.set_queue_logging(True)
+        self.addCleanup(db_tools.set_queue_logging, False)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "os.fork is not available")
+    def test_child_process_restarts_listener(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            alive = db_tools._listener._thread.is_alive()
+            self.logger.error("record of the child process")
+            db_tools._listener.stop()
+            os._exit(0 if alive else 1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.output.seek(0)
+        self.assertIn("record of the child process", self.output.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from typing import Self
+
+from bson import ObjectId
+from pydantic import Field
+
+from motor_decorator import MotorDecoratorAbstractView, MotorDecoratorRecordView
+
+
+class VendorView(MotorDecoratorAbstractView):
+    id: str
+    name: str
+    members: list[int] = Field(default_factory=list)
+    rating: float = 0.0
+
+    @classmethod
+    def from_db(cls, data: dict) -> Self:
+        data["id"] = str(data.pop("_id"))
+        return cls(**data)
+
+
+class RecordViewTest(unittest.TestCase):
+    def test_to_view_uses_from_db_of_view(self) -> None:
+        object_id = ObjectId()
+        record = VendorView.record_view().from_db({"_id": object_id, "name": "vendor"})
+        self.assertEqual(record.id, object_id)
+        self.assertEqual(record.to_view(), VendorView(id=str(object_id), name="vendor"))
+
+    def test_missing_required_field(self) -> None:
+        record_view = VendorView.record_view()
+        with self.assertRaises(TypeError):
+            record_view(name="vendor")
+        with self.assertRaises(TypeError):
+            record_view.from_db({"name": "vendor"})
+
+    def test_defaults_are_not_shared(self) -> None:
+        class VendorRecord(MotorDecoratorRecordView):
+            name: str
+            tags: list[str] = []
+            rating: float = 0.0
+
+        first, second = VendorRecord.from_db({"name": "first"}), VendorRecord(name="second")
+        self.assertEqual((first.tags, first.rating), ([], 0.0))
+        self.assertIsNot(first.tags, second.tags)
+        self.assertIsNot(
+            VendorView.record_view().from_db({"_id": 1, "name": "a"}).members,
+            VendorView.record_view().from_db({"_id": 2, "name": "b"}).members
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
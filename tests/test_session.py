@@ -0,0 +1,42 @@
+import unittest
+
+from pymongo.results import InsertOneResult
+
+from motor_decorator.objects import MotorDecoratorCollectionName
+from tests.fake_motor import FakeMotor, make_controller
+
+
+class SessionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.motor = FakeMotor(self)
+        self.motor.on("insert_one", lambda collection, document, **kwargs: InsertOneResult(None, True))
+        self.vendors = make_controller(self, "SESSION_TEST", "VENDORS")
+        self.suppliers = make_controller(self, "SESSION_TEST", "SUPPLIERS")
+        await self.vendors(MotorDecoratorCollectionName("VENDORS"))
+        await self.suppliers(MotorDecoratorCollectionName("SUPPLIERS"))
+
+    async def test_controllers_of_cluster_share_client(self) -> None:
+        self.assertIs(self.vendors.client, self.suppliers.client)
+        other = make_controller(self, "OTHER_SESSION_TEST")
+        self.assertIsNot(other.client, self.vendors.client)
+
+    async def test_transaction_reaches_other_controller_of_cluster(self) -> None:
+        async with self.vendors.transaction() as session:
+            await self.vendors.do_insert_one({"vendor": 1})
+            await self.suppliers.do_insert_one({"supplier": 1})
+        sessions = [kwargs.get("session") for _, _, kwargs in self.motor.called("insert_one")]
+        self.assertEqual(sessions, [session.delegate, session.delegate])
+        self.assertEqual(len(self.motor.called("commit_transaction")), 1)
+
+    async def test_client_is_closed_by_last_controller(self) -> None:
+        client = self.vendors.client
+        self.vendors.close()
+        self.assertIs(self.suppliers.client, client)
+        self.assertIs(self.vendors.client, client)
+        self.vendors.close()
+        self.suppliers.close()
+        self.assertIsNot(self.vendors.client, client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+from unittest import mock
+
+from pymongo import UpdateOne
+from pymongo.errors import AutoReconnect
+from pymongo.results import BulkWriteResult, InsertManyResult
+
+from motor_decorator import MotorDecoratorAbstractView
+from motor_decorator.exception import MotorDecoratorValueError
+from motor_decorator.objects import MotorDecoratorCollectionName
+from tests.fake_motor import FakeMotor, command_cursor, make_controller
+
+
+class VendorView(MotorDecoratorAbstractView):
+    id: int
+    name: str
+
+    @classmethod
+    def from_db(cls, data: dict) -> "VendorView":
+        data["id"] = data.pop("_id")
+        return cls(**data)
+
+
+class SyncDocumentsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.motor = FakeMotor(self)
+        self.stored: dict[tuple, dict] = {}
+        self.collections: list[str] = []
+        self.motor.on("bulk_write", self.bulk_write)
+        self.motor.on("insert_many", lambda collection, documents, **kwargs: InsertManyResult([], True))
+        self.motor.on("aggregate", lambda collection, pipeline, **kwargs: command_cursor(collection.database, []))
+        self.motor.on("list_collection_names", lambda database, **kwargs: list(self.collections))
+        self.controller = make_controller(self, "SYNC_TEST", "F_VENDOR")
+        await self.controller(MotorDecoratorCollectionName("VENDORS"))
+
+    def bulk_write(self, collection, requests: list[UpdateOne], **kwargs) -> BulkWriteResult:
+        counts = {"nUpserted": 0, "nMatched": 0, "nModified": 0, "upserted": []}
+        for request in requests:
+            key = tuple(sorted(request._filter.items()))
+            document = self.stored.get(key)
+            changes = request._doc.get("$set", {})
+            if document is None:
+                self.stored[key] = {**request._filter, **changes}
+                counts["nUpserted"] += 1
+            else:
+                counts["nMatched"] += 1
+                if any(document.get(field) != value for field, value in changes.items()):
+                    document.update(changes)
+                    counts["nModified"] += 1
+        return BulkWriteResult(counts, True)
+
+    @staticmethod
+    async def no_delay(delay: float) -> None:
+        return None
+
+    def requests(self) -> list[list[UpdateOne]]:
+        return [kwargs["requests"] for _, _, kwargs in self.motor.called("bulk_write")]
+
+    async def test_snapshot_skips_unchanged_and_sets_changed_fields(self) -> None:
+        snapshot = [{"_id": 1, "name": "a", "rating": 5}, {"_id": 2, "name": "b", "rating": 5}]
+        records = [{"id": 1, "name": "a", "rating": 5}, {"id": 2, "name": "b", "rating": 4}, {"id": 3, "name": "c"}]
+
+        result = await self.controller.sync_documents(records, ["id"], snapshot=snapshot)
+        self.assertEqual(self.requests(), [[
+            UpdateOne({"_id": 2}, {"$set": {"rating": 4}}, upsert=True),
+            UpdateOne({"_id": 3}, {"$set": {"name": "c"}}, upsert=True),
+        ]])
+        self.assertEqual((result.inserted, result.updated, result.unchanged, result.failed), (2, 0, 1, 0))
+
+    async def test_server_compares_documents_without_snapshot(self) -> None:
+        records = [{"id": 1, "name": "a"}]
+        await self.controller.sync_documents(records, ["id"])
+        result = await self.controller.sync_documents(records, ["id"])
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 1))
+
+    async def test_id_is_set_only_on_insert_with_other_key(self) -> None:
+        records = [{"_id": 7, "supplier_id": 1, "name": "a"}, {"supplier_id": 2}]
+        await self.controller.sync_documents(records, ["supplier_id"])
+        self.assertEqual(self.requests(), [[
+            UpdateOne({"supplier_id": 1}, {"$setOnInsert": {"_id": 7}, "$set": {"name": "a"}}, upsert=True),
+            UpdateOne({"supplier_id": 2}, {"$setOnInsert": {"supplier_id": 2}}, upsert=True),
+        ]])
+
+    async def test_view_fields_and_batches(self) -> None:
+        records = [VendorView(id=vendor, name=str(vendor)) for vendor in range(5)]
+        plain = [{"id": 5, "name": "5", "extra": True}]
+
+        result = await self.controller.sync_documents([*records, *plain], ["id"], VendorView, batch_size=2)
+        batches = self.requests()
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 2])
+        self.assertEqual(batches[-1][-1], UpdateOne({"_id": 5}, {"$set": {"name": "5"}}, upsert=True))
+        self.assertEqual((result.writes, result.inserted), (3, 6))
+
+    async def test_failed_batch_is_counted(self) -> None:
+        def bulk_write(collection, requests, **kwargs):
+            raise AutoReconnect("connection refused")
+
+        self.motor.on("bulk_write", bulk_write)
+        with mock.patch("motor_decorator.tools.MotorDecoratorTools._retry_delay", self.no_delay):
+            result = await self.controller.sync_documents([{"id": 1}, {"id": 2}], ["id"])
+        self.assertEqual(result.failed, 2)
+
+    async def test_record_without_key_field_is_rejected(self) -> None:
+        with self.assertRaises(MotorDecoratorValueError):
+            await self.controller.sync_documents([{"id": 1}, {"name": "a"}], ["id"])
+        self.assertEqual(self.motor.called("bulk_write"), [])
+
+    async def test_merge_through_staging_collection(self) -> None:
+        records = [{"supplier_id": supplier, "name": str(supplier)} for supplier in range(3)]
+        result = await self.controller.sync_documents(records, ["supplier_id"], merge_threshold=3, batch_size=2)
+
+        inserted = self.motor.called("insert_many")
+        staging = {collection.name for collection, _, _ in inserted}
+        self.assertEqual(len(staging), 1)
+        staging_name = staging.pop()
+        self.assertTrue(staging_name.startswith("VENDORS_sync_"))
+        self.assertEqual([len(kwargs["documents"]) for _, _, kwargs in inserted], [2, 1])
+
+        [(collection, (pipeline,), _)] = self.motor.called("aggregate")
+        self.assertEqual(collection.name, staging_name)
+        self.assertEqual(pipeline, [
+            {"$project": {"_id": 0}},
+            {"$merge": {"into": "VENDORS", "on": ["supplier_id"], "whenMatched": "merge", "whenNotMatched": "insert"}},
+        ])
+        self.assertEqual([collection.name for collection, _, _ in self.motor.called("drop")], [staging_name])
+        self.assertEqual((result.merged, result.writes, result.failed), (3, 3, 0))
+        self.assertNotIn("_id", records[0])
+
+    async def test_staging_collection_is_dropped_after_failed_merge(self) -> None:
+        def aggregate(collection, pipeline, **kwargs):
+            raise AutoReconnect("connection refused")
+
+        self.motor.on("aggregate", aggregate)
+        with mock.patch("motor_decorator.tools.MotorDecoratorTools._retry_delay", self.no_delay):
+            result = await self.controller.sync_documents(
+                [{"id": 1}], ["id"], merge_threshold=1, staging_collection="VENDORS_STAGING"
+            )
+        self.assertEqual((result.merged, result.failed), (0, 1))
+        self.assertEqual([collection.name for collection, _, _ in self.motor.called("drop")], ["VENDORS_STAGING"])
+
+    async def test_existing_staging_collection_is_not_used(self) -> None:
+        self.collections.append("VENDORS_STAGING")
+        with self.assertRaises(MotorDecoratorValueError):
+            await self.controller.sync_documents(
+                [{"id": 1}], ["id"], merge_threshold=1, staging_collection="VENDORS_STAGING"
+            )
+        self.assertEqual(self.motor.called("insert_many"), [])
+        self.assertEqual(self.motor.called("drop"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import datetime as dt
+import unittest
+
+from pymongo.results import InsertManyResult
+
+from motor_decorator import MotorDecoratorTimeSeries
+from motor_decorator.objects import MotorDecoratorCollectionName
+from motor_decorator.timeseries import MotorDecoratorTimeSeriesWriter
+from tests.fake_motor import FakeMotor, command_cursor, make_controller
+
+
+class TimeSeriesTest(unittest.IsolatedAsyncioTestCase):
+    time_series = MotorDecoratorTimeSeries("CPU", "ts", "host", "seconds")
+
+    def setUp(self) -> None:
+        self.controller = make_controller(self, "TIME_SERIES_TEST", "METRICS")
+        self.motor = FakeMotor(self)
+        self.collections: dict[str, str] = {}
+        self.insert_delay = 0.0
+        self.motor.on("list_collections", self.list_collections)
+        self.motor.on("create_collection", self.create_collection)
+        self.motor.on("insert_many", self.insert_many)
+
+    def list_collections(self, database, filter: dict) -> object:
+        infos = [{"name": name, "type": kind} for name, kind in self.collections.items() if name == filter["name"]]
+        return command_cursor(database, infos)
+
+    def create_collection(self, database, name: str, **options) -> object:
+        self.collections[name] = "timeseries"
+        return database[name]
+
+    async def insert_many(self, collection, documents: list[dict], **kwargs) -> InsertManyResult:
+        await asyncio.sleep(self.insert_delay)
+        return InsertManyResult([None] * len(documents), True)
+
+    def inserted(self) -> list[tuple[str, int]]:
+        calls = self.motor.called("insert_many")
+        return [(collection.name, len(kwargs["documents"])) for collection, _, kwargs in calls]
+
+    async def test_create_time_series(self) -> None:
+        await self.controller.create_time_series(self.time_series)
+        await self.controller.create_time_series(self.time_series)
+        created = [(args, kwargs) for _, args, kwargs in self.motor.called("create_collection")]
+        self.assertEqual(created, [(("CPU",), self.time_series.options())])
+        self.assertEqual(self.controller.collection.name, "CPU")
+
+    async def test_create_time_series_over_existing_collection(self) -> None:
+        self.collections["CPU"] = "collection"
+        await self.controller.create_time_series(self.time_series)
+        self.assertEqual(self.motor.called("create_collection"), [])
+
+    async def test_writer_keeps_current_collection(self) -> None:
+        await self.controller(MotorDecoratorCollectionName("OTHER"))
+        now = dt.datetime.now()
+        async with MotorDecoratorTimeSeriesWriter(self.controller, self.time_series, flush_interval=0.01) as writer:
+            await writer.add({"ts": now, "host": "a"})
+            await asyncio.sleep(0.05)
+            self.assertEqual(writer.stats.written, 1)
+        self.assertEqual(self.controller.collection.name, "OTHER")
+        self.assertEqual(self.inserted(), [("CPU", 1)])
+
+    async def test_close_waits_for_running_flush(self) -> None:
+        self.insert_delay = 0.1
+        now = dt.datetime.now()
+        async with MotorDecoratorTimeSeriesWriter(self.controller, self.time_series, flush_interval=0.01) as writer:
+            await writer.add_many({"ts": now, "host": "a", "value": value} for value in range(5))
+            await asyncio.sleep(0.03)
+        self.assertEqual((writer.stats.written, writer.stats.failed), (5, 0))
+        self.assertEqual(self.inserted(), [("CPU", 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()